@@ -5,6 +5,9 @@ from sqlalchemy import pool
 
 from alembic import context
 
+from database import DB_URL
+from models import Base
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,11 +17,14 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# alembic.ini 대신 .env 기준 DB 설정 사용 (앱과 같은 DB로 마이그레이션)
+config.set_main_option("sqlalchemy.url", DB_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -0,0 +1,96 @@
+"""initial schema
+
+기존에 Base.metadata.create_all()로 만들어진 DB는
+`alembic stamp 3abf243e09f9` 로 이 리비전을 표시한 뒤 upgrade 하면 됩니다.
+
+Revision ID: 3abf243e09f9
+Revises: 
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3abf243e09f9'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(length=16), nullable=False),
+        sa.Column('hashed_password', sa.String(length=128), nullable=False),
+        sa.Column('nickname', sa.String(length=16), nullable=False),
+        sa.Column('is_admin', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Integer(), nullable=True),
+        sa.Column('is_banned', sa.Integer(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+        sa.UniqueConstraint('nickname'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+
+    op.create_table(
+        'posts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('image_url', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('user_id', sa.String(length=16), nullable=False),
+        sa.Column('nickname', sa.String(length=16), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.user_id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_posts_id', 'posts', ['id'])
+
+    op.create_table(
+        'comments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('image_url', sa.String(length=255), nullable=True),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('nickname', sa.String(length=16), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id']),
+        sa.ForeignKeyConstraint(['parent_id'], ['comments.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_comments_id', 'comments', ['id'])
+
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('message', sa.String(length=255), nullable=True),
+        sa.Column('post_id', sa.Integer(), nullable=True),
+        sa.Column('comment_id', sa.Integer(), nullable=True),
+        sa.Column('is_read', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id']),
+        sa.ForeignKeyConstraint(['comment_id'], ['comments.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_notifications_id', 'notifications', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notifications')
+    op.drop_table('comments')
+    op.drop_table('posts')
+    op.drop_table('users')
@@ -0,0 +1,34 @@
+"""users unread notification count
+
+안 읽은 알림 수 카운터 컬럼 추가 + 기존 알림으로 초기값 채우기
+
+Revision ID: 4a39ae66612f
+Revises: eaeab0e05b5e
+Create Date: 2026-10-18 12:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a39ae66612f'
+down_revision: Union[str, None] = 'eaeab0e05b5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('unread_notification_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE users SET unread_notification_count = ("
+        "SELECT COUNT(*) FROM notifications n WHERE n.user_id = users.id AND n.is_read = 0)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'unread_notification_count')
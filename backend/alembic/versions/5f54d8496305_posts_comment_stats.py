@@ -0,0 +1,49 @@
+"""posts comment stats
+
+게시글 댓글 수 / 마지막 댓글 시간 / 마지막 활동 시간 컬럼 + 최근 활동순 인덱스
+
+Revision ID: 5f54d8496305
+Revises: fc96e5d8bd65
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f54d8496305'
+down_revision: Union[str, None] = 'fc96e5d8bd65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('posts', sa.Column('last_commented_at', sa.DateTime(), nullable=True))
+    op.add_column('posts', sa.Column('last_activity_at', sa.DateTime(), nullable=True, server_default=sa.func.now()))
+
+    # 기존 게시글 값 채우기
+    op.execute(
+        "UPDATE posts SET "
+        "comment_count = (SELECT COUNT(*) FROM comments c WHERE c.post_id = posts.id), "
+        "last_commented_at = (SELECT MAX(c.created_at) FROM comments c WHERE c.post_id = posts.id)"
+    )
+    op.execute("UPDATE posts SET last_activity_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+
+    op.alter_column(
+        'posts', 'last_activity_at',
+        existing_type=sa.DateTime(), nullable=False, existing_server_default=sa.func.now(),
+    )
+    op.create_index('ix_posts_last_activity', 'posts', ['last_activity_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_last_activity', table_name='posts')
+    op.drop_column('posts', 'last_activity_at')
+    op.drop_column('posts', 'last_commented_at')
+    op.drop_column('posts', 'comment_count')
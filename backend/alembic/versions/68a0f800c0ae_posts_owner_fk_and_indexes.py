@@ -0,0 +1,67 @@
+"""posts owner fk and indexes
+
+게시글 작성자를 정수 FK(posts.owner_id → users.id)로 옮기고 자주 쓰는 조회 조건 인덱스 추가
+- posts.user_id(로그인 아이디 문자열)는 응답 호환용으로 남기고 FK만 제거
+- 목록 정렬용 (created_at, id), (title, id) / 내 글·내 댓글용 (owner_id, created_at), (user_id, created_at)
+
+Revision ID: 68a0f800c0ae
+Revises: 5f54d8496305
+Create Date: 2026-10-18 14:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '68a0f800c0ae'
+down_revision: Union[str, None] = '5f54d8496305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _user_id_fk_and_index():
+    # 초기 스키마에서 이름 없이 만든 FK라 실제 이름(posts_ibfk_N)을 조회해서 사용
+    inspector = sa.inspect(op.get_bind())
+    fk_name = next(
+        (fk["name"] for fk in inspector.get_foreign_keys('posts') if fk["constrained_columns"] == ['user_id']),
+        None,
+    )
+    index_name = next(
+        (ix["name"] for ix in inspector.get_indexes('posts') if ix["column_names"] == ['user_id']),
+        None,
+    )
+    return fk_name, index_name
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('owner_id', sa.Integer(), nullable=True))
+    op.execute("UPDATE posts p JOIN users u ON u.user_id = p.user_id SET p.owner_id = u.id")
+    op.alter_column('posts', 'owner_id', existing_type=sa.Integer(), nullable=False)
+    # FK보다 인덱스를 먼저 만들어 MySQL이 FK용 인덱스를 따로 만들지 않게 함
+    op.create_index('ix_posts_owner_created', 'posts', ['owner_id', 'created_at'])
+    op.create_foreign_key('fk_posts_owner_id_users', 'posts', 'users', ['owner_id'], ['id'])
+
+    fk_name, index_name = _user_id_fk_and_index()
+    if fk_name:
+        op.drop_constraint(fk_name, 'posts', type_='foreignkey')
+    if index_name:
+        op.drop_index(index_name, table_name='posts')
+
+    op.create_index('ix_posts_created', 'posts', ['created_at', 'id'])
+    op.create_index('ix_posts_title', 'posts', ['title', 'id'])
+    op.create_index('ix_comments_user_created', 'comments', ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_user_created', table_name='comments')
+    op.drop_index('ix_posts_title', table_name='posts')
+    op.drop_index('ix_posts_created', table_name='posts')
+    op.create_foreign_key(None, 'posts', 'users', ['user_id'], ['user_id'])
+    op.drop_constraint('fk_posts_owner_id_users', 'posts', type_='foreignkey')
+    op.drop_index('ix_posts_owner_created', table_name='posts')
+    op.drop_column('posts', 'owner_id')
@@ -0,0 +1,29 @@
+"""notifications retention index
+
+오래된 읽은 알림 정리 작업용 (is_read, created_at) 인덱스
+
+Revision ID: ba147f477167
+Revises: 4a39ae66612f
+Create Date: 2026-10-18 13:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ba147f477167'
+down_revision: Union[str, None] = '4a39ae66612f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_notifications_read_created', 'notifications', ['is_read', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_read_created', table_name='notifications')
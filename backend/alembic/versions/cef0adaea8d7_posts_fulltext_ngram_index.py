@@ -0,0 +1,36 @@
+"""posts fulltext ngram index
+
+게시글 검색(title, content)용 FULLTEXT 인덱스 (한국어를 위해 ngram 파서 사용)
+
+Revision ID: cef0adaea8d7
+Revises: 3abf243e09f9
+Create Date: 2026-10-18 10:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cef0adaea8d7'
+down_revision: Union[str, None] = '3abf243e09f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FULLTEXT ... WITH PARSER ngram 은 MySQL(InnoDB) 전용
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.execute(
+        "ALTER TABLE posts ADD FULLTEXT INDEX ft_posts_title_content (title, content) WITH PARSER ngram"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_posts_title_content', table_name='posts')
@@ -0,0 +1,42 @@
+"""image blobs
+
+내용 주소 방식 이미지 저장소의 참조 수 테이블
+
+Revision ID: cf6d1c8f2b31
+Revises: cef0adaea8d7
+Create Date: 2026-10-18 11:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cf6d1c8f2b31'
+down_revision: Union[str, None] = 'cef0adaea8d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'image_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('content_type', sa.String(length=32), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('released_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256'),
+    )
+    op.create_index('ix_image_blobs_sweep', 'image_blobs', ['ref_count', 'released_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_image_blobs_sweep', table_name='image_blobs')
+    op.drop_table('image_blobs')
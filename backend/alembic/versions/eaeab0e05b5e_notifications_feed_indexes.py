@@ -0,0 +1,31 @@
+"""notifications feed indexes
+
+알림 목록(최신순)/안 읽은 알림/증분 조회용 복합 인덱스
+
+Revision ID: eaeab0e05b5e
+Revises: cf6d1c8f2b31
+Create Date: 2026-10-18 12:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eaeab0e05b5e'
+down_revision: Union[str, None] = 'cf6d1c8f2b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_notifications_user_read_created', 'notifications', ['user_id', 'is_read', 'created_at'])
+    op.create_index('ix_notifications_user_created', 'notifications', ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_created', table_name='notifications')
+    op.drop_index('ix_notifications_user_read_created', table_name='notifications')
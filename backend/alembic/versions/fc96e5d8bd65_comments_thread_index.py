@@ -0,0 +1,29 @@
+"""comments thread index
+
+게시글별 최상위 댓글/대댓글 페이지 조회용 (post_id, parent_id, created_at) 인덱스
+
+Revision ID: fc96e5d8bd65
+Revises: ba147f477167
+Create Date: 2026-10-18 13:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fc96e5d8bd65'
+down_revision: Union[str, None] = 'ba147f477167'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_comments_post_parent_created', 'comments', ['post_id', 'parent_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_post_parent_created', table_name='comments')
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+# 이름을 붙인 캐시 목록 (메트릭에서 적중률을 노출할 때 사용)
+_named_caches = {}
+
+
+def named_caches() -> dict:
+    return dict(_named_caches)
+
+
+# 🧊 크기 제한 + TTL 캐시 (프로세스 내부용)
+class TTLCache:
+    """
+    maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 제거하고,
+    ttl(초)이 지난 항목은 조회 시 만료 처리하는 스레드 안전 캐시
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: str = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if name:
+            _named_caches[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,186 @@
+import os
+from typing import Optional
+
+import orjson
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import TTLCache
+from image_variants import variant_urls
+from models import Comment
+from pagination import encode_cursor, decode_cursor
+
+DELETED_NICKNAME = "탈퇴한 사용자"
+
+# 🌳 게시글별 댓글 트리 캐시 (post_id → 직렬화된 JSON bytes)
+# 댓글 작성/수정/삭제 시 invalidate_comment_tree()로 비우고,
+# 다른 워커 프로세스에는 최대 COMMENT_TREE_CACHE_TTL초 늦게 반영됨
+COMMENT_TREE_CACHE_TTL = float(os.getenv("COMMENT_TREE_CACHE_TTL", "30"))
+COMMENT_TREE_CACHE_SIZE = int(os.getenv("COMMENT_TREE_CACHE_SIZE", "1000"))
+comment_tree_cache = TTLCache(maxsize=COMMENT_TREE_CACHE_SIZE, ttl=COMMENT_TREE_CACHE_TTL, name="comment_tree")
+
+# 📄 페이지 단위 스레드 조회 기본값
+COMMENT_PAGE_SIZE = int(os.getenv("COMMENT_PAGE_SIZE", "20"))          # 한 번에 보내는 댓글 수
+COMMENT_REPLY_PREVIEW = int(os.getenv("COMMENT_REPLY_PREVIEW", "3"))   # 댓글마다 미리 보여줄 대댓글 수
+
+# 응답에 필요한 컬럼만 튜플로 조회 (ORM 객체를 만들지 않음)
+COMMENT_COLUMNS = (
+    Comment.id,
+    Comment.post_id,
+    Comment.content,
+    Comment.image_url,
+    Comment.parent_id,
+    Comment.created_at,
+    Comment.user_id,
+    Comment.nickname,
+)
+
+
+def invalidate_comment_tree(post_id: Optional[int]):
+    if post_id is not None:
+        comment_tree_cache.delete(post_id)
+
+
+def comment_row_to_dict(row) -> dict:
+    """
+    COMMENT_COLUMNS 순서의 행 → CommentResponse와 같은 모양의 dict
+    """
+    comment_id, post_id, content, image_url, parent_id, created_at, user_id, nickname = row
+    return {
+        "id": comment_id,
+        "post_id": post_id,
+        "content": content,
+        "image_url": image_url,
+        "image_variants": variant_urls(image_url),
+        "parent_id": parent_id,
+        "created_at": created_at,
+        "user_id": user_id,
+        "nickname": nickname or DELETED_NICKNAME,
+        "replies": [],
+    }
+
+
+def build_comment_tree(rows) -> list:
+    """
+    id 오름차순 행 목록으로 한 번에 트리 구성 (부모는 항상 자식보다 먼저 작성되므로 id가 작음)
+    부모가 없는(삭제된) 대댓글은 버림
+    """
+    nodes = {}
+    roots = []
+    for row in rows:
+        node = comment_row_to_dict(row)
+        nodes[node["id"]] = node
+        if node["parent_id"]:
+            parent = nodes.get(node["parent_id"])
+            if parent:
+                parent["replies"].append(node)
+        else:
+            roots.append(node)
+    return roots
+
+
+def dumps(data) -> bytes:
+    return orjson.dumps(data)
+
+
+async def render_comment_tree(db: AsyncSession, post_id: int) -> bytes:
+    """
+    게시글의 전체 댓글 트리를 JSON bytes로 반환 (캐시 우선)
+    """
+    cached = comment_tree_cache.get(post_id)
+    if cached is not None:
+        return cached
+    result = await db.execute(select(*COMMENT_COLUMNS).where(Comment.post_id == post_id).order_by(Comment.id))
+    body = dumps(build_comment_tree(result.all()))
+    comment_tree_cache.set(post_id, body)
+    return body
+
+
+# 📄 페이지 단위 스레드 조회 (최상위 댓글 + 대댓글 미리보기, 깊이 2단계까지)
+def _after_cursor(cursor: Optional[str]):
+    # (created_at, id) 오름차순 keyset 조건
+    if not cursor:
+        return None
+    _, (created_at, comment_id) = decode_cursor(cursor, datetime_fields=(0,), size=2)
+    return or_(
+        Comment.created_at > created_at,
+        and_(Comment.created_at == created_at, Comment.id > comment_id),
+    )
+
+
+def _cursor_of(node: dict) -> str:
+    return encode_cursor([node["created_at"], node["id"]])
+
+
+async def _page(db: AsyncSession, conditions: list, cursor: Optional[str], limit: int) -> tuple:
+    """
+    조건에 맞는 댓글을 (created_at, id) 순으로 limit개 조회 → (dict 목록, 다음 커서)
+    다음 페이지가 있는지 알기 위해 limit + 1개를 읽음
+    """
+    after = _after_cursor(cursor)
+    if after is not None:
+        conditions = conditions + [after]
+    result = await db.execute(
+        select(*COMMENT_COLUMNS).where(*conditions)
+        .order_by(Comment.created_at, Comment.id)
+        .limit(limit + 1)
+    )
+    rows = result.all()
+    nodes = [comment_row_to_dict(row) for row in rows[:limit]]
+    next_cursor = _cursor_of(nodes[-1]) if len(rows) > limit else None
+    return nodes, next_cursor
+
+
+async def load_thread_page(db: AsyncSession, post_id: int, cursor: Optional[str], limit: int, reply_preview: int) -> dict:
+    """
+    최상위 댓글 한 페이지와 각 댓글의 대댓글 미리보기/개수를 쿼리 3번으로 조회
+    (post_id, parent_id, created_at) 인덱스 범위만 읽으므로 전체 댓글 수와 무관
+    """
+    roots, next_cursor = await _page(db, [Comment.post_id == post_id, Comment.parent_id == None], cursor, limit)
+    if not roots:
+        return {"comments": [], "next_cursor": None}
+
+    root_ids = [node["id"] for node in roots]
+    counts = dict((await db.execute(
+        select(Comment.parent_id, func.count(Comment.id))
+        .where(Comment.post_id == post_id, Comment.parent_id.in_(root_ids))
+        .group_by(Comment.parent_id)
+    )).all())
+
+    previews = {}
+    if reply_preview > 0 and counts:
+        # 부모별로 앞에서 reply_preview개만 (ROW_NUMBER 윈도 함수)
+        ranked = (
+            select(
+                *COMMENT_COLUMNS,
+                func.row_number().over(
+                    partition_by=Comment.parent_id,
+                    order_by=(Comment.created_at, Comment.id),
+                ).label("rn"),
+            )
+            .where(Comment.post_id == post_id, Comment.parent_id.in_(list(counts)))
+            .subquery()
+        )
+        result = await db.execute(
+            select(*(ranked.c[column.key] for column in COMMENT_COLUMNS))
+            .where(ranked.c.rn <= reply_preview)
+            .order_by(ranked.c.parent_id, ranked.c.created_at, ranked.c.id)
+        )
+        for row in result.all():
+            node = comment_row_to_dict(row)
+            previews.setdefault(node["parent_id"], []).append(node)
+
+    for node in roots:
+        node["replies"] = previews.get(node["id"], [])
+        node["reply_count"] = counts.get(node["id"], 0)
+        has_more = node["reply_count"] > len(node["replies"])
+        node["next_reply_cursor"] = _cursor_of(node["replies"][-1]) if has_more and node["replies"] else None
+    return {"comments": roots, "next_cursor": next_cursor}
+
+
+async def load_replies(db: AsyncSession, post_id: int, parent_id: int, cursor: Optional[str], limit: int) -> dict:
+    """
+    한 댓글의 대댓글을 페이지 단위로 조회 (대댓글의 대댓글은 포함하지 않음)
+    """
+    replies, next_cursor = await _page(db, [Comment.post_id == post_id, Comment.parent_id == parent_id], cursor, limit)
+    return {"replies": replies, "next_cursor": next_cursor}
@@ -1,8 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import mysql.connector
+from query_stats import instrument_engine, InstrumentedConnection
 
 # .env 파일 로드
 load_dotenv()
@@ -14,34 +19,151 @@ DB_HOST = os.getenv('DB_HOST')
 DB_PORT = os.getenv('DB_PORT')
 DB_NAME = os.getenv('DB_NAME')
 
-# SQLAlchemy용 DB URL
-DB_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# 커넥션 풀 설정 (요청마다 새 TCP 연결 + 인증을 맺지 않도록 공유 풀 사용)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))          # 항상 유지하는 연결 수
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))    # 풀이 비었을 때 추가로 열 수 있는 연결 수
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # 연결을 기다리는 최대 시간(초)
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # MySQL wait_timeout 전에 연결 재생성(초)
 
-# SQLAlchemy 엔진 및 세션 설정
-engine = create_engine(DB_URL, echo=True)
+# SQL 로그 출력 (모든 쿼리를 stdout에 동기로 찍으므로 로컬 디버깅할 때만 켬, 느린 쿼리는 query_stats에서 기록)
+DB_ECHO = os.getenv('DB_ECHO', '0') == '1'
+
+# SQLAlchemy용 DB URL (DB_URL / ASYNC_DB_URL 환경 변수로 덮어쓸 수 있음, 예: sqlite+aiosqlite:///./local.db)
+DB_URL = os.getenv('DB_URL') or f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# 비동기 라우터용 URL (aiomysql 드라이버)
+ASYNC_DB_URL = os.getenv('ASYNC_DB_URL') or f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+# 📊 풀 사용 통계 (모니터링용)
+class _PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0     # 누적 체크아웃 횟수
+        self.waits = 0         # 빈 연결이 없어 대기한 횟수
+        self.timeouts = 0      # 대기 시간 초과로 실패한 횟수
+        self.wait_time = 0.0   # 누적 대기 시간(초)
+
+    def record_wait(self, elapsed: float, timed_out: bool):
+        with self._lock:
+            self.waits += 1
+            self.wait_time += elapsed
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+
+class _InstrumentedPoolMixin:
+    """
+    대기 횟수/타임아웃을 기록하는 풀 (stats는 풀 클래스마다 따로 둠)
+    """
+    stats: _PoolStats
+
+    def _do_get(self):
+        # 남은 연결도 없고 overflow 한도도 찼다면 이번 체크아웃은 대기하게 됨 (max_overflow=-1은 한도 없음)
+        if self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow:
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+                raise
+            self.stats.record_wait(time.perf_counter() - started, timed_out=False)
+            return conn
+        return super()._do_get()
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = _PoolStats()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    stats = _PoolStats()
+
+
+def _pool_options(url: str, poolclass) -> dict:
+    # SQLite(테스트/로컬 대체용)는 SQLAlchemy 기본 풀 설정을 그대로 사용
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,  # 끊어진 연결을 꺼내기 전에 확인
+    }
+
+
+# SQLAlchemy 엔진 및 세션 설정 (동기: 스크립트/마이그레이션/get_connection용)
+engine = create_engine(DB_URL, echo=DB_ECHO, **_pool_options(DB_URL, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# ⚡ 비동기 엔진 및 세션 설정 (FastAPI 라우터용, 이벤트 루프를 막지 않음)
+async_engine = create_async_engine(ASYNC_DB_URL, echo=DB_ECHO, **_pool_options(ASYNC_DB_URL, InstrumentedAsyncQueuePool))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# ⏱ 요청별 쿼리 수 / DB 시간, 느린 쿼리 로그
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    InstrumentedQueuePool.stats.record_checkout()
+
+
+@event.listens_for(async_engine.sync_engine, "checkout")
+def _on_async_checkout(dbapi_connection, connection_record, connection_proxy):
+    InstrumentedAsyncQueuePool.stats.record_checkout()
+
+
 # Base 클래스 생성 (한 번만 정의)
 Base = declarative_base()
 
 # ✅ MySQL Connector 방식 (MySQL 직접 연결용)
 def get_connection():
     """
-    MySQL Connector를 사용하여 데이터베이스에 직접 연결
+    SQLAlchemy 엔진의 커넥션 풀에서 MySQL Connector 연결을 빌려옴
+    (close() 호출 시 실제로 끊지 않고 풀에 반환됨, 커서 실행 시간은 query_stats에 기록)
     """
     try:
-        conn = mysql.connector.connect(
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT,
-            database=DB_NAME
-        )
-        return conn
-    except mysql.connector.Error as err:
+        return InstrumentedConnection(engine.raw_connection())
+    except exc.TimeoutError as err:
+        print(f"Error: 커넥션 풀 대기 시간 초과 ({err})")
+        return None
+    except (exc.DBAPIError, mysql.connector.Error) as err:
         print(f"Error: {err}")
         return None
 
+# 📊 풀 상태 조회
+def _describe_pool(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"pool_class": type(pool).__name__}
+    stats = getattr(pool, "stats", _PoolStats())
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": stats.checkouts,
+        "waits": stats.waits,
+        "wait_time_seconds": round(stats.wait_time, 6),
+        "timeouts": stats.timeouts,
+    }
+
+def get_pool_stats() -> dict:
+    """
+    현재 커넥션 풀 사용량과 누적 통계를 반환 (async: 라우터용, sync: get_connection/스크립트용)
+    """
+    return {
+        "async": _describe_pool(async_engine.sync_engine.pool),
+        "sync": _describe_pool(engine.pool),
+    }
+
 # ✅ SQLAlchemy 세션 의존성 함수 (SQLAlchemy 세션용)
 def get_db():
     """
@@ -52,3 +174,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# ⚡ 비동기 세션 의존성 함수 (async def 라우터용)
+async def get_async_db():
+    """
+    AsyncSession을 반환하는 의존성 함수
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# 🖼 리사이즈/재압축 변형 이미지 설정 (원본과 같은 폴더에 <sha256>_<이름>.<확장자>로 저장)
+VARIANTS = {
+    "thumb": {"max_size": 320, "format": None},     # 목록/댓글용 썸네일 (원본 형식 유지)
+    "medium": {"max_size": 1024, "format": None},   # 상세 보기용
+    "webp": {"max_size": 1024, "format": "webp"},   # WebP를 지원하는 브라우저용
+}
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "82"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))  # 리사이즈 전용 프로세스 수
+
+# 변형을 만드는 원본 형식 (GIF는 애니메이션이 깨지므로 제외)
+_VARIANT_SOURCE_RE = re.compile(r"^(.*/uploads/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64})\.(jpg|png|webp)$")
+_PIL_FORMATS = {"jpg": "JPEG", "png": "PNG", "webp": "WEBP"}
+
+_executor = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def variant_path(path: str, name: str) -> str:
+    """
+    원본 경로(ab/cd/<sha256>.jpg)에 대응하는 변형 이미지 경로
+    """
+    base, ext = os.path.splitext(path)
+    fmt = VARIANTS[name]["format"]
+    return f"{base}_{name}.{fmt}" if fmt else f"{base}_{name}{ext}"
+
+
+def has_variants(path: str) -> bool:
+    return os.path.splitext(path)[1].lstrip(".") in _PIL_FORMATS
+
+
+def variant_urls(image_url: Optional[str]) -> Optional[dict]:
+    """
+    image_url에 대응하는 변형 이미지 URL 목록 (변형이 없는 이미지는 None)
+    """
+    if not image_url or not _VARIANT_SOURCE_RE.match(image_url):
+        return None
+    return {name: variant_path(image_url, name) for name in VARIANTS}
+
+
+def missing_variants(src_path: str) -> list:
+    """
+    아직 만들어지지 않은 변형 이름 목록
+    """
+    return [name for name in VARIANTS if not os.path.exists(variant_path(src_path, name))]
+
+
+def generate_variants(src_path: str) -> list:
+    """
+    (프로세스 풀에서 실행) 원본 이미지로 변형 이미지를 만들고 생성한 경로 목록을 반환
+    이미 있는 변형은 다시 만들지 않음 (모두 있으면 원본을 디코딩하지 않음)
+    """
+    names = missing_variants(src_path)
+    if not names:
+        return []
+
+    from PIL import Image, ImageOps
+
+    created = []
+    with Image.open(src_path) as original:
+        original.load()
+        image = ImageOps.exif_transpose(original)
+        for name in names:
+            spec = VARIANTS[name]
+            target = variant_path(src_path, name)
+            fmt = (spec["format"] or os.path.splitext(src_path)[1].lstrip(".")).lower()
+            resized = image.copy()
+            resized.thumbnail((spec["max_size"], spec["max_size"]), Image.LANCZOS)
+            if fmt == "jpg" and resized.mode not in ("RGB", "L"):
+                resized = resized.convert("RGB")
+            tmp = target + ".part"
+            options = {"optimize": True}
+            if fmt in ("jpg", "webp"):
+                options["quality"] = IMAGE_QUALITY
+            resized.save(tmp, format=_PIL_FORMATS[fmt], **options)
+            os.replace(tmp, target)
+            created.append(target)
+    return created
+
+
+async def create_variants(src_path: str) -> list:
+    """
+    이벤트 루프를 막지 않도록 프로세스 풀에서 변형 이미지 생성
+    중복 업로드처럼 변형이 이미 모두 있으면 프로세스 풀에 넘기지 않음
+    """
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, missing_variants, src_path):
+        return []
+    return await loop.run_in_executor(_get_executor(), generate_variants, src_path)
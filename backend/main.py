@@ -1,17 +1,52 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()  # 부팅 시간 측정 (import 시작 시점)
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from routes import posts, upload, comments, auth, admin, notifications, user
-from fastapi.staticfiles import StaticFiles
+from routes import posts, upload, comments, auth, admin, notifications, user, monitoring
+from upload_service import UPLOAD_DIR, blob_sweeper_loop, ensure_upload_dir
+from notification_service import notification_retention_loop
+from image_variants import shutdown_executor as shutdown_image_executor
+from password_hasher import shutdown_executor as shutdown_password_executor
+from static_files import UploadStaticFiles
+from query_stats import QueryStatsMiddleware
+from metrics import MetricsMiddleware, metrics_flush_loop, set_boot_time
+from schema_check import verify_schema_revision
 from fastapi.middleware.cors import CORSMiddleware
 
 
-# 🔧 DB 테이블 자동 생성
-from database import engine
-from models import Base
+# 🚀 시작/종료 처리
+# 테이블 생성은 alembic upgrade head로만 하고, 여기서는 리비전만 확인 (create_all로 모든 테이블을 검사하지 않음)
+# 폴더 생성/DB 확인은 import가 아니라 서버가 실제로 뜰 때 한 번만 실행
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    ensure_upload_dir()
+    await verify_schema_revision()
+
+    # 🧹 백그라운드 작업: 참조가 0이 된 이미지 정리, 오래된 읽은 알림 정리, 메트릭 스냅샷
+    app.state.background_tasks = [
+        asyncio.create_task(blob_sweeper_loop()),
+        asyncio.create_task(notification_retention_loop()),
+        asyncio.create_task(metrics_flush_loop()),
+    ]
 
-# DB 테이블을 자동으로 생성
-Base.metadata.create_all(bind=engine)
+    startup_seconds = time.perf_counter() - started
+    set_boot_time("import", IMPORT_SECONDS)
+    set_boot_time("startup", startup_seconds)
+    logging.getLogger("uvicorn.error").info("🚀 부팅 시간: import %.2fs, startup %.2fs", IMPORT_SECONDS, startup_seconds)
+    try:
+        yield
+    finally:
+        for task in app.state.background_tasks:
+            task.cancel()
+        shutdown_image_executor()
+        shutdown_password_executor()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # ✅ CORS 설정: 특정 도메인에서의 접근을 허용
 app.add_middleware(
@@ -20,8 +55,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # 모든 HTTP 메서드 허용
     allow_headers=["*"],  # 모든 HTTP 헤더 허용
+    expose_headers=["X-Next-Cursor", "Server-Timing"],  # 알림 목록 다음 페이지 커서, 요청별 DB 시간
 )
 
+# ⏱ 요청별 쿼리 수 / DB 시간 (Server-Timing 헤더, 느린 쿼리 로그)
+app.add_middleware(QueryStatsMiddleware)
+
+# 📈 라우트별 요청 수 / 응답 시간 (/metrics에서 Prometheus 형식으로 노출)
+app.add_middleware(MetricsMiddleware)
+
 # ✅ 라우터 등록: 게시글, 댓글, 파일 업로드 라우터를 앱에 포함
 app.include_router(posts.router, tags=["posts"])
 app.include_router(upload.router, tags=["uploads"])
@@ -31,7 +73,10 @@ app.include_router(admin.router) # 관리자 전용 라우터
 app.include_router(notifications.router, tags=["notifications"])
 
 # ✅ 업로드된 이미지 접근 가능하게 설정
-# `/uploads` 경로로 업로드된 파일에 접근할 수 있도록 StaticFiles 설정
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# `/uploads` 경로로 업로드된 파일에 접근 (강한 ETag, immutable 캐시, Range 지원)
+app.mount("/uploads", UploadStaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")  # 폴더는 lifespan에서 생성
 
 app.include_router(user.router, tags=["user"])
+app.include_router(monitoring.router, tags=["monitoring"])
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+import anyio
+
+from cache import named_caches
+from database import get_pool_stats
+from notification_hub import hub
+
+# 📈 메트릭 설정
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# 워커가 여러 개일 때 워커별 스냅샷을 모아 둘 폴더 (비우면 이 워커 값만 노출, 배포할 때마다 비워 줄 것)
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))   # 스냅샷 파일 갱신 주기(초)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")                           # 설정하면 /metrics에 Bearer 토큰 필요
+
+# 응답 시간 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_requests_total": ("counter", "라우트별 요청 수"),
+    "http_request_duration_seconds": ("histogram", "라우트별 응답 시간(초)"),
+    "http_requests_in_flight": ("gauge", "처리 중인 요청 수"),
+    "upload_bytes_total": ("counter", "업로드된 이미지 바이트 수"),
+    "uploads_total": ("counter", "업로드된 이미지 수 (new: 새로 저장, duplicate: 기존 파일 재사용)"),
+    "db_pool_size": ("gauge", "커넥션 풀 크기"),
+    "db_pool_checked_out": ("gauge", "사용 중인 DB 연결 수"),
+    "db_pool_overflow": ("gauge", "pool_size를 넘어 추가로 연 연결 수"),
+    "db_pool_checkouts_total": ("counter", "누적 연결 체크아웃 수"),
+    "db_pool_waits_total": ("counter", "빈 연결이 없어 대기한 횟수"),
+    "db_pool_timeouts_total": ("counter", "연결 대기 시간 초과 횟수"),
+    "db_pool_wait_seconds_total": ("counter", "연결 대기 누적 시간(초)"),
+    "cache_hits_total": ("counter", "캐시 적중 수 (적중률 = hits / (hits + misses))"),
+    "cache_misses_total": ("counter", "캐시 미스 수"),
+    "cache_entries": ("gauge", "캐시 항목 수"),
+    "notification_ws_connections": ("gauge", "알림 웹소켓 연결 수"),
+    "app_boot_seconds": ("gauge", "워커 부팅 시간(초) (import: 모듈 import, startup: lifespan 시작 처리)"),
+}
+
+
+class Registry:
+    """
+    워커(프로세스) 하나의 메트릭 저장소
+    값은 이벤트 루프 스레드에서만 갱신하므로 잠금 없이 dict에 바로 더함
+    키는 (이름, ((라벨, 값), ...)) 튜플
+    """
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.gauges = defaultdict(float)
+        self.histograms = {}  # 키 → 구간별 개수(누적 아님) + [합계, 개수]
+
+    def inc(self, name: str, value: float = 1, **labels):
+        self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def add_gauge(self, name: str, delta: float, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] += delta
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+        index = bisect_left(LATENCY_BUCKETS, value)
+        if index < len(LATENCY_BUCKETS):
+            hist[index] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+
+registry = Registry()
+
+
+def inc(name: str, value: float = 1, **labels):
+    if METRICS_ENABLED:
+        registry.inc(name, value, **labels)
+
+
+def set_boot_time(phase: str, seconds: float):
+    registry.set_gauge("app_boot_seconds", round(seconds, 4), phase=phase)
+
+
+# 📸 스냅샷 (조회 시점에 읽는 값 포함, JSON으로 저장 가능한 형태)
+def _entries(values: dict) -> list:
+    return [[name, [list(label) for label in labels], value] for (name, labels), value in values.items()]
+
+
+def snapshot() -> dict:
+    counters = dict(registry.counters)
+    gauges = dict(registry.gauges)
+
+    for pool_name, pool in get_pool_stats().items():
+        if "checked_out" not in pool:
+            continue  # SQLite 등 QueuePool이 아닌 경우
+        labels = (("pool", pool_name),)
+        gauges[("db_pool_size", labels)] = pool["pool_size"]
+        gauges[("db_pool_checked_out", labels)] = pool["checked_out"]
+        gauges[("db_pool_overflow", labels)] = pool["overflow"]
+        counters[("db_pool_checkouts_total", labels)] = pool["checkouts"]
+        counters[("db_pool_waits_total", labels)] = pool["waits"]
+        counters[("db_pool_timeouts_total", labels)] = pool["timeouts"]
+        counters[("db_pool_wait_seconds_total", labels)] = pool["wait_time_seconds"]
+
+    for cache_name, cache in named_caches().items():
+        labels = (("cache", cache_name),)
+        stats = cache.stats()
+        counters[("cache_hits_total", labels)] = stats["hits"]
+        counters[("cache_misses_total", labels)] = stats["misses"]
+        gauges[("cache_entries", labels)] = stats["size"]
+
+    gauges[("notification_ws_connections", ())] = hub.connection_count()
+
+    return {
+        "counters": _entries(counters),
+        "gauges": _entries(gauges),
+        "histograms": _entries({key: list(hist) for key, hist in registry.histograms.items()}),
+    }
+
+
+# 👥 멀티 워커 합산: 워커마다 <pid>.json을 주기적으로 쓰고, /metrics는 모든 파일을 합침
+# 종료된 워커 파일의 카운터/히스토그램은 계속 합산하고 게이지만 뺌 (카운터가 줄어들지 않도록)
+def _snapshot_path(pid: int = None) -> str:
+    return os.path.join(METRICS_MULTIPROC_DIR, f"{pid or os.getpid()}.json")
+
+
+def _write_snapshot(data: dict):
+    path = _snapshot_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshots(own: dict) -> list:
+    snapshots = [(own, True)]
+    stale_before = time.time() - METRICS_FLUSH_SECONDS * 3
+    own_path = _snapshot_path()
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+        path = os.path.join(METRICS_MULTIPROC_DIR, name)
+        if not name.endswith(".json") or path == own_path:
+            continue
+        try:
+            alive = os.path.getmtime(path) >= stale_before
+            with open(path, encoding="utf-8") as f:
+                snapshots.append((json.load(f), alive))
+        except (OSError, ValueError):
+            continue  # 쓰는 중이거나 지워진 파일
+    return snapshots
+
+
+def _merge(snapshots: list) -> dict:
+    merged = {"counters": defaultdict(float), "gauges": defaultdict(float), "histograms": {}}
+    for data, alive in snapshots:
+        for kind in ("counters", "gauges"):
+            if kind == "gauges" and not alive:
+                continue
+            for name, labels, value in data[kind]:
+                merged[kind][(name, tuple(tuple(label) for label in labels))] += value
+        for name, labels, hist in data["histograms"]:
+            key = (name, tuple(tuple(label) for label in labels))
+            total = merged["histograms"].setdefault(key, [0] * len(hist))
+            for i, value in enumerate(hist):
+                total[i] += value
+    return merged
+
+
+async def metrics_flush_loop():
+    """
+    METRICS_MULTIPROC_DIR가 설정된 경우에만 스냅샷 파일을 주기적으로 갱신 (startup에서 실행)
+    """
+    if not METRICS_MULTIPROC_DIR:
+        return
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    try:
+        while True:
+            await anyio.to_thread.run_sync(_write_snapshot, snapshot())
+            await asyncio.sleep(METRICS_FLUSH_SECONDS)
+    finally:
+        # 정상 종료 시 게이지가 남지 않도록 마지막 값을 쓰되 오래된 파일로 표시
+        try:
+            _write_snapshot(snapshot())
+            os.utime(_snapshot_path(), (0, 0))
+        except OSError:
+            pass
+
+
+# 📝 Prometheus 텍스트 형식
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(merged: dict) -> str:
+    by_name = defaultdict(list)
+    for kind in ("counters", "gauges", "histograms"):
+        for (name, labels), value in merged[kind].items():
+            by_name[name].append((labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        metric_type, help_text = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in sorted(by_name[name]):
+            if metric_type != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, value):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {_format_value(cumulative)}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {_format_value(value[-1])}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_value(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+async def render_metrics() -> str:
+    """
+    이 워커의 현재 값 (+ 멀티 워커면 다른 워커 스냅샷) 을 Prometheus 텍스트로 반환
+    """
+    own = snapshot()
+    if not METRICS_MULTIPROC_DIR:
+        return render(_merge([(own, True)]))
+
+    def collect():
+        os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+        _write_snapshot(own)
+        return render(_merge(_read_snapshots(own)))
+
+    return await anyio.to_thread.run_sync(collect)
+
+
+# ⏱ 라우트별 요청 수 / 응답 시간 / 처리 중 요청 수 (순수 ASGI 미들웨어)
+def _route_label(scope) -> str:
+    # 경로 파라미터 값 대신 라우트 템플릿을 라벨로 사용 (/posts/{post_id}), 매칭 안 된 요청은 하나로 묶음
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    return scope.get("root_path") or "unmatched"  # /uploads 같은 mount는 root_path에 경로가 남음
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.add_gauge("http_requests_in_flight", 1)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.add_gauge("http_requests_in_flight", -1)
+            route = _route_label(scope)
+            method = scope["method"]
+            registry.inc("http_requests_total", method=method, route=route, status=str(status))
+            registry.observe("http_request_duration_seconds", time.perf_counter() - started, method=method, route=route)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base  # Base는 database.py에서 import한 것
@@ -15,7 +15,7 @@ class User(Base):
     is_active = Column(Integer, default=1)  # ✅ 정지 여부 추가
     is_banned = Column(Integer, default=0)  # 0: 정상, 1: 정지
     is_deleted = Column(Boolean, default=False)
-
+    unread_notification_count = Column(Integer, nullable=False, default=0, server_default="0")  # 🔔 안 읽은 알림 수 (notification_service에서 관리)
 
     posts = relationship("Post", back_populates="owner")
     comments = relationship("Comment", back_populates="owner")
@@ -29,12 +29,27 @@ class Post(Base):
     title = Column(String(255), nullable=False)  # 제목
     content = Column(Text, nullable=False)  # 내용
     image_url = Column(String(255), nullable=True)  # 이미지 URL
-    created_at = Column(DateTime, default=datetime.utcnow)  # 작성 시간
-    user_id = Column(String(16), ForeignKey("users.user_id"), nullable=False)  # user_id로 수정
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())  # 작성 시간
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # 작성자 (소유자 판별/조인은 이 컬럼으로)
+    user_id = Column(String(16), nullable=False)  # 작성자 로그인 아이디 (응답 호환용, 바뀌지 않는 값)
+    nickname = Column(String(16), nullable=True)  # 작성 시점 닉네임 (목록 조회 시에는 users.nickname 사용)
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")  # 💬 댓글 수 (post_stats에서 관리)
+    last_commented_at = Column(DateTime, nullable=True)  # 마지막 댓글 시간
+    last_activity_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now())  # 작성 또는 마지막 댓글 시간 (order=active)
 
     owner = relationship("User", back_populates="posts")
     comments = relationship("Comment", back_populates="post", cascade="all, delete")
 
+    __table_args__ = (
+        # 🔍 제목+내용 검색용 FULLTEXT 인덱스 (한국어 검색을 위해 ngram 파서 사용)
+        Index("ft_posts_title_content", "title", "content", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+        Index("ix_posts_last_activity", "last_activity_at", "id"),
+        # 📋 목록 정렬(최신순/오래된순, 제목순)과 내 글 목록용
+        Index("ix_posts_created", "created_at", "id"),
+        Index("ix_posts_title", "title", "id"),
+        Index("ix_posts_owner_created", "owner_id", "created_at"),
+    )
+
 
 # 📌 Comment 모델 (댓글)
 class Comment(Base):
@@ -53,6 +68,12 @@ class Comment(Base):
     parent = relationship("Comment", remote_side=[id], backref="replies")
     owner = relationship("User", back_populates="comments")
 
+    __table_args__ = (
+        # 💬 게시글별 최상위 댓글/대댓글 페이지 조회용
+        Index("ix_comments_post_parent_created", "post_id", "parent_id", "created_at"),
+        Index("ix_comments_user_created", "user_id", "created_at"),  # 내 댓글 목록용
+    )
+
 # 📌 Notification 모델 (알림)
 class Notification(Base):
     __tablename__ = "notifications"
@@ -68,3 +89,26 @@ class Notification(Base):
 
     user = relationship("User", backref="notifications")
 
+    __table_args__ = (
+        # 🔔 알림 목록/증분 조회용 (안 읽은 알림만, 전체 최신순)
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+        Index("ix_notifications_read_created", "is_read", "created_at"),  # 오래된 읽은 알림 정리용
+    )
+
+
+# 📌 ImageBlob 모델 (내용 주소 방식 이미지 저장소)
+class ImageBlob(Base):
+    __tablename__ = "image_blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # 이미지 내용 해시
+    path = Column(String(255), nullable=False)  # uploads/ 기준 상대 경로 (ab/cd/<sha256>.<ext>)
+    size = Column(Integer, nullable=False)
+    content_type = Column(String(32), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)  # 이 이미지를 쓰는 게시글/댓글 수
+    created_at = Column(DateTime, default=datetime.utcnow)
+    released_at = Column(DateTime, nullable=True)  # 참조 수가 0이 된 시각 (스위퍼 유예 기간 기준)
+
+    __table_args__ = (
+        Index("ix_image_blobs_sweep", "ref_count", "released_at"),
+    )
@@ -0,0 +1,71 @@
+import asyncio
+import os
+from collections import defaultdict
+
+# 📡 실시간 알림 허브 설정
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "100"))                # 연결당 대기 이벤트 한도
+NOTIFY_HEARTBEAT_SECONDS = float(os.getenv("NOTIFY_HEARTBEAT_SECONDS", "25"))  # 이벤트가 없을 때 ping 주기
+
+
+class Subscription:
+    """
+    WebSocket 연결 하나의 이벤트 큐
+    느린 연결 때문에 다른 연결이 밀리지 않도록, 큐가 넘치면 overflowed만 표시하고
+    연결 쪽에서 끊은 뒤 클라이언트가 last_id로 다시 이어받게 함
+    """
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, event: dict):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue = asyncio.Queue(maxsize=1)
+            self.queue.put_nowait(None)  # 밀린 이벤트는 버리고 종료 신호만 남김
+
+    async def next_event(self, timeout: float):
+        # timeout 동안 이벤트가 없으면 TimeoutError, 큐가 넘쳤으면 None
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class NotificationHub:
+    """
+    프로세스 내부 pub/sub (user pk → 구독 목록)
+    같은 워커 프로세스에 연결된 WebSocket에만 전달되므로,
+    다른 워커에서 생긴 알림은 재연결 시 last_id 이후 조회로 보충됨
+    """
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id)
+        self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: int, event: dict) -> int:
+        """
+        user_id의 모든 연결에 이벤트를 넣고 전달한 연결 수를 반환
+        """
+        subscribers = self._subscribers.get(user_id, ())
+        for subscription in list(subscribers):
+            subscription.push(event)
+        return len(subscribers)
+
+    def connection_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+hub = NotificationHub()
@@ -0,0 +1,195 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update, delete, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models import Notification, User
+
+# 🔔 알림 쓰기 + 안 읽은 알림 수(users.unread_notification_count) 관리
+# 알림의 is_read/삭제와 카운터 변경을 같은 트랜잭션에서 처리
+# (이름에 all이 붙은 함수와 정리 작업만 청크마다 직접 commit, 나머지는 호출한 쪽에서 commit)
+NOTIFY_BULK_CHUNK = int(os.getenv("NOTIFY_BULK_CHUNK", "1000"))                      # 한 번에 바꾸는 최대 행 수
+NOTIFY_RETENTION_DAYS = int(os.getenv("NOTIFY_RETENTION_DAYS", "90"))                 # 읽은 알림 보관 기간 (0이면 정리 안 함)
+NOTIFY_RETENTION_INTERVAL = float(os.getenv("NOTIFY_RETENTION_INTERVAL", "21600"))    # 정리 주기(초)
+
+
+async def _adjust_unread(db: AsyncSession, user_id: int, delta: int):
+    if not delta:
+        return
+    new_count = User.unread_notification_count + delta
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(unread_notification_count=case((new_count < 0, 0), else_=new_count))
+    )
+
+
+async def _delete_where(db: AsyncSession, *conditions) -> int:
+    """
+    조건에 맞는 알림을 DELETE 한 번으로 지우고, 받은 사람별로 안 읽은 알림 수를 줄임
+    안 읽은 행을 잠가 두고 세므로 그 사이 읽음 처리와 겹쳐도 카운터가 두 번 줄지 않음
+    """
+    unread_rows = (await db.execute(
+        select(Notification.user_id)
+        .where(*conditions, Notification.is_read == False)
+        .with_for_update()
+    )).scalars().all()
+    result = await db.execute(delete(Notification).where(*conditions))
+    unread_by_user = {}
+    for user_id in unread_rows:
+        unread_by_user[user_id] = unread_by_user.get(user_id, 0) + 1
+    for user_id, unread in unread_by_user.items():
+        await _adjust_unread(db, user_id, -unread)
+    return result.rowcount
+
+
+async def _next_chunk(db: AsyncSession, *conditions) -> list:
+    result = await db.execute(
+        select(Notification.id).where(*conditions).order_by(Notification.id).limit(NOTIFY_BULK_CHUNK)
+    )
+    return result.scalars().all()
+
+
+async def add_notification(db: AsyncSession, notification: Notification):
+    db.add(notification)
+    if not notification.is_read:
+        await _adjust_unread(db, notification.user_id, 1)
+
+
+async def mark_notifications_read(db: AsyncSession, user_id: int, notification_id: int) -> int:
+    """
+    안 읽은 알림 하나를 읽음 처리하고 바뀐 개수(0/1)를 반환
+    is_read 조건을 UPDATE에 넣어 동시에 같은 알림을 읽어도 카운터가 두 번 줄지 않음
+    """
+    result = await db.execute(
+        update(Notification)
+        .where(Notification.id == notification_id, Notification.user_id == user_id, Notification.is_read == False)
+        .values(is_read=True)
+    )
+    await _adjust_unread(db, user_id, -result.rowcount)
+    return result.rowcount
+
+
+async def mark_all_notifications_read(db: AsyncSession, user_id: int) -> int:
+    """
+    안 읽은 알림 전체를 NOTIFY_BULK_CHUNK개씩 UPDATE하고 청크마다 commit, 바뀐 개수를 반환
+    (쌓인 알림이 많아도 한 트랜잭션이 행 잠금을 오래 잡지 않음)
+    """
+    updated = 0
+    while True:
+        ids = await _next_chunk(db, Notification.user_id == user_id, Notification.is_read == False)
+        if not ids:
+            break
+        result = await db.execute(
+            update(Notification)
+            .where(Notification.id.in_(ids), Notification.is_read == False)
+            .values(is_read=True)
+        )
+        await _adjust_unread(db, user_id, -result.rowcount)
+        await db.commit()
+        updated += result.rowcount
+        if len(ids) < NOTIFY_BULK_CHUNK:
+            break
+    return updated
+
+
+async def delete_user_notifications(db: AsyncSession, user_id: int, notification_id: int) -> int:
+    return await _delete_where(db, Notification.id == notification_id, Notification.user_id == user_id)
+
+
+async def delete_all_user_notifications(db: AsyncSession, user_id: int) -> int:
+    """
+    내 알림 전체를 NOTIFY_BULK_CHUNK개씩 삭제하고 청크마다 commit, 삭제한 개수를 반환
+    """
+    deleted = 0
+    while True:
+        ids = await _next_chunk(db, Notification.user_id == user_id)
+        if not ids:
+            break
+        deleted += await _delete_where(db, Notification.id.in_(ids))
+        await db.commit()
+        if len(ids) < NOTIFY_BULK_CHUNK:
+            break
+    return deleted
+
+
+async def delete_comment_notifications(db: AsyncSession, comment_ids: Iterable[int]) -> int:
+    """
+    댓글 삭제 전에 관련 알림을 한 번에 지움
+    """
+    comment_ids = list(comment_ids)
+    if not comment_ids:
+        return 0
+    return await _delete_where(db, Notification.comment_id.in_(comment_ids))
+
+
+async def delete_post_notifications(db: AsyncSession, post_id: int) -> int:
+    """
+    게시글 삭제 전에 게시글/댓글 알림을 한 번에 지움 (댓글 알림도 post_id를 가지고 있음)
+    """
+    return await _delete_where(db, Notification.post_id == post_id)
+
+
+async def get_unread_count(db: AsyncSession, user_id: int) -> int:
+    count = (await db.execute(
+        select(User.unread_notification_count).where(User.id == user_id)
+    )).scalar_one_or_none()
+    return count or 0
+
+
+async def recount_unread(db: AsyncSession, user_id: Optional[int] = None):
+    """
+    카운터를 notifications 테이블 기준으로 다시 계산 (마이그레이션/운영 중 보정용)
+    """
+    unread = (
+        select(func.count(Notification.id))
+        .where(Notification.user_id == User.id, Notification.is_read == False)
+        .scalar_subquery()
+    )
+    query = update(User).values(unread_notification_count=unread)
+    if user_id is not None:
+        query = query.where(User.id == user_id)
+    await db.execute(query)
+
+
+# 🧹 오래된 읽은 알림 정리
+async def purge_read_notifications(retention_days: int = NOTIFY_RETENTION_DAYS) -> int:
+    """
+    생성된 지 retention_days가 지난 읽은 알림을 청크 단위로 삭제하고 삭제한 개수를 반환
+    읽은 알림만 지우므로 카운터는 바뀌지 않음
+    """
+    if retention_days <= 0:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    purged = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            ids = await _next_chunk(db, Notification.is_read == True, Notification.created_at < cutoff)
+            if not ids:
+                break
+            result = await db.execute(
+                delete(Notification).where(Notification.id.in_(ids), Notification.is_read == True)
+            )
+            await db.commit()
+            purged += result.rowcount
+            if len(ids) < NOTIFY_BULK_CHUNK:
+                break
+    return purged
+
+
+async def notification_retention_loop():
+    """
+    NOTIFY_RETENTION_INTERVAL마다 purge_read_notifications 실행 (앱 시작 시 백그라운드 태스크로 띄움)
+    """
+    while True:
+        await asyncio.sleep(NOTIFY_RETENTION_INTERVAL)
+        try:
+            purged = await purge_read_notifications()
+            if purged:
+                print(f"🧹 오래된 알림 {purged}개 정리")
+        except Exception as err:
+            print(f"Error: 알림 정리 실패 ({err})")
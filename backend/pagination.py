@@ -0,0 +1,84 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from database import AsyncSessionLocal
+
+# 📤 NDJSON 내보내기 시 한 번에 읽는 행 수
+NDJSON_CHUNK_SIZE = int(os.getenv("NDJSON_CHUNK_SIZE", "500"))
+
+
+# 🔖 커서 인코딩/디코딩 (클라이언트에는 불투명한 문자열로 전달)
+def encode_cursor(values: list, direction: str = "next") -> str:
+    """
+    정렬 키 값 목록과 방향(next/prev)을 URL-safe 문자열로 인코딩
+    """
+    payload = {
+        "d": direction,
+        "v": [v.isoformat() if isinstance(v, datetime) else v for v in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, datetime_fields: tuple = (), size: Optional[int] = None) -> tuple:
+    """
+    encode_cursor로 만든 문자열을 (방향, 정렬 키 값 목록)으로 복원
+    datetime_fields에 지정한 위치의 값은 datetime으로 변환
+    size를 주면 값 개수가 다른 커서는 400
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction = payload["d"]
+        values = list(payload["v"])
+        for i in datetime_fields:
+            values[i] = datetime.fromisoformat(values[i])
+    except (ValueError, KeyError, IndexError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+    if direction not in ("next", "prev") or (size is not None and len(values) != size):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+    return direction, values
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """
+    encode_cursor([id])로 만든 커서 → id (커서가 없으면 0)
+    """
+    if not cursor:
+        return 0
+    _, values = decode_cursor(cursor, size=1)
+    if not isinstance(values[0], int):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+    return values[0]
+
+
+# 📤 NDJSON 스트리밍 (id keyset으로 청크씩 읽어 한 줄에 한 행씩 전송)
+def ndjson_response(query, id_column, to_dict, after_id: int = 0) -> StreamingResponse:
+    """
+    query(select)를 id_column 오름차순으로 NDJSON_CHUNK_SIZE개씩 끝까지 읽어 스트리밍
+    - 테이블 전체를 메모리에 올리지 않음 (청크 하나만 유지)
+    - 청크마다 세션을 새로 열어 연결을 오래 잡고 있지 않음
+    """
+    async def lines():
+        last_id = after_id
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    query.where(id_column > last_id).order_by(id_column).limit(NDJSON_CHUNK_SIZE)
+                )
+                rows = result.all()
+            if not rows:
+                break
+            yield b"".join(orjson.dumps(to_dict(row)) + b"\n" for row in rows)
+            last_id = rows[-1].id
+            if len(rows) < NDJSON_CHUNK_SIZE:
+                break
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# 🔒 bcrypt 설정
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))                   # cost factor (1 늘 때마다 2배 느려짐)
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))              # 해시 전용 프로세스 수
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", str(PASSWORD_WORKERS * 8)))  # 실행 중 + 대기 작업 한도
+
+# 워커 프로세스에서도 같은 환경 변수로 만들어짐
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=BCRYPT_ROUNDS)
+
+_executor = None
+_pending = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _hash_rounds(hashed_password: str) -> Optional[int]:
+    # $2b$12$... → 12
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# 🔧 (프로세스 풀에서 실행) 비밀번호 처리
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> tuple:
+    """
+    비밀번호가 맞으면 (True, 새 해시 또는 None)
+    저장된 해시의 cost가 BCRYPT_ROUNDS와 다르면 새 해시를 함께 돌려줌
+    """
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    if _hash_rounds(hashed_password) != BCRYPT_ROUNDS or pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
+
+async def _run(func, *args):
+    """
+    프로세스 풀에 작업을 넘김 (이벤트 루프와 공용 스레드풀을 막지 않음)
+    대기 작업이 PASSWORD_MAX_PENDING을 넘으면 바로 429로 거절
+    """
+    global _pending
+    if _pending >= PASSWORD_MAX_PENDING:
+        raise HTTPException(
+            status_code=429,
+            detail="요청이 많아 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple:
+    return await _run(verify_password, plain_password, hashed_password)
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy import update, select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Post, Comment
+
+# 💬 게시글 댓글 수 / 마지막 댓글 시간 / 마지막 활동 시간 관리
+# 댓글 쓰기와 같은 트랜잭션에서 처리하므로 commit은 호출한 쪽에서 함
+# (값이 어긋나면 python -m tools.reconcile_post_stats 로 다시 계산)
+
+
+async def on_comment_added(db: AsyncSession, post_id: int, created_at: datetime):
+    await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(
+            comment_count=Post.comment_count + 1,
+            last_commented_at=created_at,
+            # 게시글 created_at(DB 서버 시간)과 같은 기준으로 비교되도록 DB 시간 사용
+            last_activity_at=func.now(),
+        )
+    )
+
+
+async def on_comments_removed(db: AsyncSession, post_id: int, removed: int = 1):
+    """
+    댓글 삭제(flush) 뒤에 호출: 댓글 수를 줄이고 마지막 댓글 시간을 남은 댓글 기준으로 다시 계산
+    (comments의 post_id 인덱스 범위만 읽음, 마지막 활동 시간은 그대로 둠)
+    """
+    new_count = Post.comment_count - removed
+    last_commented = (
+        select(func.max(Comment.created_at))
+        .where(Comment.post_id == post_id)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(
+            comment_count=case((new_count < 0, 0), else_=new_count),
+            last_commented_at=last_commented,
+        )
+    )
@@ -0,0 +1,214 @@
+import logging
+import os
+import re
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+# 🐢 SQL 계측 설정
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))                  # 이 시간(ms) 이상 걸린 쿼리는 로그로 남김 (0이면 끔)
+SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS", "0") == "1"    # 1이면 파라미터 값도 기록 (기본: 값 가림)
+SQL_SERVER_TIMING = os.getenv("SQL_SERVER_TIMING", "0") == "1"            # 1이면 응답에 Server-Timing 헤더 추가 (로컬 프로파일링·벤치마크용, 운영에서는 끔)
+
+# 🔁 N+1 / 쿼리 예산 검사 (테스트·벤치마크용, 켜면 요청마다 실행한 SQL 문장을 모아 둠)
+QUERY_TRACKING = os.getenv("QUERY_TRACKING", "0") == "1"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "3"))        # 같은 문장이 이 횟수 이상 반복되면 N+1로 봄
+
+slow_query_logger = logging.getLogger("sql.slow")
+budget_logger = logging.getLogger("sql.budget")
+
+
+class QueryStats:
+    """
+    요청 하나 동안 실행된 쿼리 수 / DB 시간 누적값
+    (QUERY_TRACKING이 켜져 있으면 문장별 실행 횟수와 라우트가 선언한 쿼리 예산도 보관)
+    """
+    __slots__ = ("count", "duration", "statements", "budget")
+
+    def __init__(self, tracking: bool = False):
+        self.count = 0
+        self.duration = 0.0  # 초
+        self.statements = Counter() if tracking else None
+        self.budget = None
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        if self.statements is not None:
+            self.statements[statement] += 1
+
+
+# 요청마다 새 QueryStats를 넣어 둠 (요청 밖에서 실행된 쿼리는 기록하지 않음)
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries():
+    """
+    HTTP 요청 밖(스크립트/검사 도구)에서 쿼리 수와 문장별 실행 횟수를 모을 때 사용
+        with track_queries() as stats: ...
+    """
+    stats = QueryStats(tracking=True)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _redact(parameters) -> str:
+    if SLOW_QUERY_LOG_PARAMS:
+        return repr(parameters)
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}=?" for key in parameters) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return f"<{len(parameters)} params>"
+    return "<params>"
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _record(statement: str, parameters, elapsed: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            "🐢 slow query %.1fms: %s params=%s",
+            elapsed * 1000, _WHITESPACE.sub(" ", statement).strip()[:1000], _redact(parameters),
+        )
+
+
+# 📏 라우트별 쿼리 예산: @router.get(..., dependencies=[Depends(query_budget(3))])
+def query_budget(limit: int):
+    async def declare_query_budget():
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = limit
+    return declare_query_budget
+
+
+# 요청 하나에서 발견한 문제 (N+1 의심 / 예산 초과), 최근 것만 보관 (tools.query_budget에서 확인)
+query_issues = deque(maxlen=1000)
+
+
+def check_query_stats(stats: QueryStats, route: str) -> list:
+    """
+    예산 초과와 같은 문장 반복(N+1 의심)을 찾아 query_issues에 쌓고 로그로 남김
+    """
+    issues = []
+    if stats.budget is not None and stats.count > stats.budget:
+        issues.append({"route": route, "kind": "budget", "count": stats.count, "budget": stats.budget})
+    for statement, times in (stats.statements or {}).items():
+        if times >= N_PLUS_ONE_THRESHOLD:
+            issues.append({
+                "route": route, "kind": "n+1", "count": times,
+                "statement": _WHITESPACE.sub(" ", statement).strip()[:300],
+            })
+    for issue in issues:
+        query_issues.append(issue)
+        if issue["kind"] == "budget":
+            budget_logger.warning("📏 %s: 쿼리 %d개 (예산 %d개)", route, issue["count"], issue["budget"])
+        else:
+            budget_logger.warning("🔁 %s: 같은 쿼리 %d번 반복 (N+1 의심): %s", route, issue["count"], issue["statement"])
+    return issues
+
+
+# ✅ SQLAlchemy 엔진 계측 (async 엔진은 sync_engine을 넘김)
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        _record(statement, parameters, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+# ✅ 엔진 이벤트를 거치지 않는 DBAPI 연결(get_connection) 계측
+class _InstrumentedCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            if params is None:  # 드라이버마다 None 파라미터 처리가 달라서 넘기지 않음
+                return self._cursor.execute(operation, *args, **kwargs)
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            _record(operation, params, time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            _record(operation, seq_params, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class InstrumentedConnection:
+    """
+    cursor()가 실행 시간을 기록하는 커서를 돌려주는 연결 래퍼 (나머지는 원래 연결에 위임)
+    """
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return _InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+# ⏱ 요청별 쿼리 수 / DB 시간 집계 + Server-Timing 헤더 (순수 ASGI 미들웨어)
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats(tracking=QUERY_TRACKING)
+        token = _current.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and SQL_SERVER_TIMING:
+                total_ms = (time.perf_counter() - started) * 1000
+                value = (
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if QUERY_TRACKING:
+                check_query_stats(stats, f'{scope["method"]} {getattr(scope.get("route"), "path", scope["path"])}')
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Awaitable, Callable, Iterable, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from cache import TTLCache
+
+# 🗃 공개 조회 API 응답 캐시 설정
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+
+
+class CacheBackend:
+    """
+    응답 캐시 저장소 인터페이스 (get/set/delete/incr만 있으면 됨)
+    Redis 같은 외부 저장소로 바꾸려면 이 클래스를 구현해 set_backend()로 등록
+    값은 bytes/int/dict 등 직렬화 가능한 값만 저장함
+    """
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    프로세스 내부 LRU + TTL 저장소 (기본값)
+    태그 버전은 LRU에서 밀려나지 않도록 따로 보관
+    """
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl, name="response")
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        if key in self._counters:
+            return self._counters[key]
+        return self._entries.get(key)
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        self._entries.set(key, value, ttl)
+
+    def delete(self, key: str):
+        self._entries.delete(key)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+_backend: CacheBackend = MemoryCacheBackend()
+
+
+def set_backend(backend: CacheBackend):
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> CacheBackend:
+    return _backend
+
+
+# 🏷 태그 무효화: 태그마다 버전 번호를 두고, 저장할 때의 버전과 다르면 만료로 봄
+# (키 목록을 따로 관리하지 않으므로 어떤 키-값 저장소에서도 동작)
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+def _tag_versions(tags: Iterable[str]) -> dict:
+    return {tag: _backend.get(_tag_key(tag)) or 0 for tag in tags}
+
+
+def invalidate_tags(*tags: str):
+    for tag in tags:
+        _backend.incr(_tag_key(tag))
+
+
+# 📌 게시글 응답 태그 (목록 / 게시글별 / 작성자 닉네임이 보이는 모든 응답)
+POST_LIST_TAG = "post-list"
+POST_AUTHORS_TAG = "post-authors"
+
+
+def post_tag(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def invalidate_post_responses(post_id: Optional[int] = None):
+    # 게시글 작성/수정/삭제, 댓글 수 변경
+    if post_id is None:
+        invalidate_tags(POST_LIST_TAG)
+    else:
+        invalidate_tags(POST_LIST_TAG, post_tag(post_id))
+
+
+def invalidate_author_responses():
+    # 닉네임 변경/회원 삭제
+    invalidate_tags(POST_LIST_TAG, POST_AUTHORS_TAG)
+
+
+def _cache_key(request: Request) -> str:
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    return f"resp:{request.url.path}?{query}"
+
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _response(request: Request, entry: dict, cache_status: str) -> Response:
+    headers = {
+        "ETag": entry["etag"],
+        "Last-Modified": formatdate(entry["last_modified"], usegmt=True),
+        "Cache-Control": "no-cache",  # 브라우저는 저장하되 매번 ETag로 재검증
+        "X-Cache": cache_status,
+    }
+    if _not_modified(request, entry["etag"], entry["last_modified"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+# ✅ 캐시된 응답 (요청자와 무관한 공개 조회 API 전용)
+async def cached_json(request: Request, tags: Iterable[str], build: Callable[[], Awaitable]) -> Response:
+    """
+    경로+쿼리 파라미터를 키로 JSON 응답을 캐시
+    - 캐시 적중 시 DB를 전혀 조회하지 않음 (세션은 첫 쿼리 때 연결을 빌리므로)
+    - ETag / Last-Modified 헤더를 붙이고 If-None-Match / If-Modified-Since가 맞으면 304
+    - build()에서 HTTPException이 나면 캐시하지 않고 그대로 전달
+    """
+    tags = list(tags)
+    if not RESPONSE_CACHE_ENABLED:
+        return _response(request, _make_entry(await build(), {}), "BYPASS")
+
+    key = _cache_key(request)
+    versions = _tag_versions(tags)
+    entry = _backend.get(key)
+    if entry is not None and entry["tags"] == versions:
+        return _response(request, entry, "HIT")
+
+    entry = _make_entry(await build(), versions)
+    _backend.set(key, entry)
+    return _response(request, entry, "MISS")
+
+
+def _make_entry(data, versions: dict) -> dict:
+    body = orjson.dumps(data)
+    return {
+        "body": body,
+        "etag": f'"{hashlib.sha1(body).hexdigest()}"',
+        "last_modified": time.time(),
+        "tags": versions,
+    }
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
-from routes.auth import get_current_user, UserInfo
-from models import User, Post, Comment, Notification
-import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, get_pool_stats
+from routes.auth import get_current_user, UserInfo, invalidate_principal
+from models import User, Post, Comment
+from routes.posts import invalidate_post_caches
+from response_cache import invalidate_post_responses, invalidate_author_responses
+from notification_service import delete_comment_notifications, delete_post_notifications
+from post_stats import on_comments_removed
+from upload_service import release_upload
+from comment_tree import invalidate_comment_tree
+from pagination import encode_cursor, decode_id_cursor, ndjson_response
+from typing import Optional
 
 router = APIRouter(
     prefix="/admin",
@@ -15,119 +23,165 @@ def verify_admin(current_user: UserInfo):
     if not getattr(current_user, "is_admin", False):
         raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
 
+async def _get_user(db: AsyncSession, user_id: str) -> User:
+    result = await db.execute(select(User).where(User.user_id == user_id))
+    return result.scalars().first()
+
 # ✅ 관리자 대시보드 (간단한 접근 확인용)
 @router.get("/dashboard")
-def admin_dashboard(current_user: UserInfo = Depends(get_current_user)):
+async def admin_dashboard(current_user: UserInfo = Depends(get_current_user)):
     verify_admin(current_user)
     return {"message": "관리자 대시보드 접근 성공", "nickname": current_user.nickname}
 
-# ✅ 전체 사용자 조회 (삭제되지 않은 사용자만)
+# 📊 DB 커넥션 풀 상태 조회 (모니터링용)
+@router.get("/db-pool")
+async def db_pool_status(current_user: UserInfo = Depends(get_current_user)):
+    verify_admin(current_user)
+    return get_pool_stats()
+
+USER_COLUMNS = (User.id, User.user_id, User.nickname, User.is_admin, User.is_active, User.is_banned)
+
+def _user_row_to_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "nickname": row.nickname,
+        "is_admin": row.is_admin,
+        "is_active": row.is_active,
+        "is_banned": row.is_banned
+    }
+
+# ✅ 전체 사용자 조회 (삭제되지 않은 사용자만, id 순 keyset 페이지)
+# 다음 페이지 커서는 X-Next-Cursor 헤더, format=ndjson이면 cursor 이후 전체를 스트리밍
 @router.get("/users")
-def list_users(db: Session = Depends(get_db), current_user: UserInfo = Depends(get_current_user)):
+async def list_users(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    banned_only: bool = Query(False),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserInfo = Depends(get_current_user)
+):
     verify_admin(current_user)
-    users = db.query(User).filter(User.is_deleted == False).all()
-    return [
-        {
-            "id": u.id,
-            "user_id": u.user_id,
-            "nickname": u.nickname,
-            "is_admin": u.is_admin,
-            "is_active": u.is_active,
-            "is_banned": u.is_banned
-        }
-        for u in users
-    ]
+    after_id = decode_id_cursor(cursor)
+    query = select(*USER_COLUMNS).where(User.is_deleted == False)
+    if banned_only:
+        query = query.where(User.is_banned == 1)
+
+    if format == "ndjson":
+        return ndjson_response(query, User.id, _user_row_to_dict, after_id)
+
+    result = await db.execute(query.where(User.id > after_id).order_by(User.id).limit(limit))
+    users = [_user_row_to_dict(row) for row in result.all()]
+    if len(users) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([users[-1]["id"]])
+    return users
 
 # ✅ 회원 정지
 @router.patch("/ban-user/{user_id}")
-def ban_user(user_id: str, db: Session = Depends(get_db), current_user: UserInfo = Depends(get_current_user)):
+async def ban_user(user_id: str, db: AsyncSession = Depends(get_async_db), current_user: UserInfo = Depends(get_current_user)):
     verify_admin(current_user)
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await _get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="해당 사용자를 찾을 수 없습니다.")
     if user.is_admin:
         raise HTTPException(status_code=400, detail="관리자는 정지할 수 없습니다.")
     user.is_banned = 1
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.id)
     return {"message": f"{user.nickname} 계정을 정지시켰습니다."}
 
 # ✅ 회원 정지 해제
 @router.patch("/unban-user/{user_id}")
-def unban_user(
+async def unban_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
     verify_admin(current_user)
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await _get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="해당 사용자를 찾을 수 없습니다.")
     if user.is_admin:
         raise HTTPException(status_code=400, detail="관리자는 정지 해제 대상이 아닙니다.")
     user.is_banned = 0
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.id)
     return {"message": f"{user.nickname} 계정의 정지를 해제했습니다."}
 
 # ✅ 회원 삭제 (논리 삭제 방식)
 @router.delete("/users/{user_id}")
-def delete_user(user_id: str, db: Session = Depends(get_db), current_user: UserInfo = Depends(get_current_user)):
+async def delete_user(user_id: str, db: AsyncSession = Depends(get_async_db), current_user: UserInfo = Depends(get_current_user)):
     verify_admin(current_user)
-    user = db.query(User).filter(User.user_id == user_id).first()
+    user = await _get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="해당 유저를 찾을 수 없습니다.")
     user.is_deleted = True
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.id)
+    invalidate_author_responses()
     return {"message": f"{user_id} 계정이 삭제(표시)되었습니다."}
 
 # ✅ 게시글 강제 삭제
 @router.delete("/force-delete-post/{post_id}")
-def force_delete_post(post_id: int, db: Session = Depends(get_db), current_user: UserInfo = Depends(get_current_user)):
+async def force_delete_post(post_id: int, db: AsyncSession = Depends(get_async_db), current_user: UserInfo = Depends(get_current_user)):
     verify_admin(current_user)
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-    if post.image_url:
-        image_path = os.path.join("uploads", os.path.basename(post.image_url))
-        if os.path.exists(image_path):
-            os.remove(image_path)
-    db.delete(post)
-    db.commit()
+    await release_upload(db, post.image_url)
+    comment_images = await db.execute(
+        select(Comment.image_url).where(Comment.post_id == post_id, Comment.image_url != None)
+    )
+    for image_url in comment_images.scalars().all():
+        await release_upload(db, image_url)
+    # 알림 → 댓글 → 게시글 순으로 한 번씩만 삭제 (댓글을 하나씩 지우지 않음)
+    await delete_post_notifications(db, post_id)
+    await db.execute(update(Comment).where(Comment.post_id == post_id).values(parent_id=None))
+    await db.execute(delete(Comment).where(Comment.post_id == post_id))
+    await db.execute(delete(Post).where(Post.id == post_id))
+    await db.commit()
+    invalidate_comment_tree(post_id)
+    invalidate_post_caches(post_id)
     return {"message": f"게시글 {post_id}가 삭제되었습니다."}
 
 # ✅ 댓글 강제 삭제 (알림 포함)
 @router.delete("/force-delete-comment/{comment_id}")
-def force_delete_comment(comment_id: int, db: Session = Depends(get_db), current_user: UserInfo = Depends(get_current_user)):
+async def force_delete_comment(comment_id: int, db: AsyncSession = Depends(get_async_db), current_user: UserInfo = Depends(get_current_user)):
     verify_admin(current_user)
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = (await db.execute(select(Comment).where(Comment.id == comment_id))).scalars().first()
     if not comment:
         raise HTTPException(status_code=404, detail="댓글을 찾을 수 없습니다.")
 
     # 🔁 관련 알림 먼저 삭제
-    db.query(Notification).filter(Notification.comment_id == comment.id).delete()
-
-    if comment.image_url:
-        image_path = os.path.join("uploads", os.path.basename(comment.image_url))
-        if os.path.exists(image_path):
-            os.remove(image_path)
-    db.delete(comment)
-    db.commit()
+    await delete_comment_notifications(db, [comment.id])
+
+    await release_upload(db, comment.image_url)
+    await db.delete(comment)
+    await db.flush()
+    await on_comments_removed(db, comment.post_id)
+    await db.commit()
+    invalidate_comment_tree(comment.post_id)
+    invalidate_post_responses(comment.post_id)
     return {"message": f"댓글 {comment_id}가 삭제되었습니다."}
 
 # ✅ 대댓글 강제 삭제 (알림 포함)
 @router.delete("/force-delete-reply/{comment_id}")
-def force_delete_reply(comment_id: int, db: Session = Depends(get_db), current_user: UserInfo = Depends(get_current_user)):
+async def force_delete_reply(comment_id: int, db: AsyncSession = Depends(get_async_db), current_user: UserInfo = Depends(get_current_user)):
     verify_admin(current_user)
-    reply = db.query(Comment).filter(Comment.id == comment_id, Comment.parent_id != None).first()
+    reply = (await db.execute(select(Comment).where(Comment.id == comment_id, Comment.parent_id != None))).scalars().first()
     if not reply:
         raise HTTPException(status_code=404, detail="대댓글을 찾을 수 없습니다.")
 
     # 🔁 관련 알림 먼저 삭제
-    db.query(Notification).filter(Notification.comment_id == reply.id).delete()
-
-    if reply.image_url:
-        image_path = os.path.join("uploads", os.path.basename(reply.image_url))
-        if os.path.exists(image_path):
-            os.remove(image_path)
-    db.delete(reply)
-    db.commit()
+    await delete_comment_notifications(db, [reply.id])
+
+    await release_upload(db, reply.image_url)
+    await db.delete(reply)
+    await db.flush()
+    await on_comments_removed(db, reply.post_id)
+    await db.commit()
+    invalidate_comment_tree(reply.post_id)
+    invalidate_post_responses(reply.post_id)
     return {"message": f"대댓글 {comment_id}가 삭제되었습니다."}
@@ -1,15 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from cache import TTLCache
+from password_hasher import hash_password_async, verify_password_async
+from response_cache import invalidate_author_responses
+from query_stats import query_budget
 from pydantic import BaseModel
+from typing import Optional
 from models import User
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from fastapi.security import OAuth2PasswordBearer
-
-# 🔒 비밀번호 암호화 설정
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import os
 
 # 🔐 JWT 설정
 SECRET_KEY = "your_secret_key"
@@ -17,6 +20,18 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)  # 토큰이 없어도 401을 내지 않음
+
+# 🧊 인증된 사용자 상태 캐시 (user pk → UserInfo)
+# 요청마다 users 테이블을 조회하지 않도록 짧게 캐시하고,
+# 정지/해제/삭제/닉네임 변경 시 invalidate_principal()로 바로 비움
+# (다른 워커 프로세스에는 최대 AUTH_CACHE_TTL초 늦게 반영됨)
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+principal_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL, name="auth_principal")
+
+def invalidate_principal(user_pk: int):
+    principal_cache.delete(user_pk)
 
 router = APIRouter(
     prefix="/auth",
@@ -40,13 +55,6 @@ class UserInfo(BaseModel):
     is_admin: bool
     is_banned: bool
 
-# 🔧 비밀번호 처리
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 # 🔑 JWT 토큰 생성
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
@@ -56,32 +64,37 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
 
 # 🧾 회원가입 API
 @router.post("/register")
-def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     if len(user.user_id) > 16 or len(user.password) > 20 or len(user.nickname) > 16:
         raise HTTPException(status_code=400, detail="입력값 길이 제한 초과")
 
-    if db.query(User).filter(User.user_id == user.user_id).first():
+    if (await db.execute(select(User.id).where(User.user_id == user.user_id))).first():
         raise HTTPException(status_code=400, detail="아이디가 이미 존재합니다.")
-    if db.query(User).filter(User.nickname == user.nickname).first():
+    if (await db.execute(select(User.id).where(User.nickname == user.nickname))).first():
         raise HTTPException(status_code=400, detail="닉네임이 이미 존재합니다.")
 
-    hashed_pw = hash_password(user.password)
+    # bcrypt는 CPU를 오래 쓰므로 전용 프로세스 풀에서 실행 (포화 시 429)
+    hashed_pw = await hash_password_async(user.password)
     new_user = User(user_id=user.user_id, hashed_password=hashed_pw, nickname=user.nickname)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     return {"message": "회원가입 성공"}
 
 # 🔓 로그인 API
-@router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(
+@router.post("/login", dependencies=[Depends(query_budget(2))])
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).where(
         User.user_id == user.user_id,
         User.is_deleted == False  # ✅ 탈퇴하지 않은 사용자만 로그인 가능
-    ).first()
+    ))
+    db_user = result.scalars().first()
+
+    if not db_user:
+        raise HTTPException(status_code=400, detail="아이디 또는 비밀번호 오류")
 
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    verified, new_hash = await verify_password_async(user.password, db_user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=400, detail="아이디 또는 비밀번호 오류")
 
     if db_user.is_active == 0:
@@ -89,6 +102,11 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
     if db_user.is_banned == 1:
         raise HTTPException(status_code=403, detail="정지된 계정입니다.")
 
+    # 🔁 BCRYPT_ROUNDS가 바뀌었으면 로그인 성공 시 새 cost로 다시 저장
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={
@@ -109,7 +127,17 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
     }
 
 # 👤 현재 사용자 정보 가져오기 (의존성)
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> UserInfo:
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> UserInfo:
+    return await authenticate_token(db, token)
+
+# 👤 로그인한 경우에만 사용자 정보 (비로그인이면 None, 토큰이 잘못됐으면 401)
+async def get_optional_user(db: AsyncSession = Depends(get_async_db), token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[UserInfo]:
+    if not token:
+        return None
+    return await authenticate_token(db, token)
+
+# 🔐 토큰 검증 (HTTP 의존성과 WebSocket 연결에서 함께 사용)
+async def authenticate_token(db: AsyncSession, token: str) -> UserInfo:
     credentials_exception = HTTPException(
         status_code=401,
         detail="사용자 인증에 실패했습니다.",
@@ -128,29 +156,37 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(
-        User.id == user_pk,
-        User.user_id == user_id,
-        User.is_deleted == False  # ✅ 탈퇴한 유저는 인증 실패 처리
-    ).first()
+    principal = principal_cache.get(user_pk)
+    if principal is None:
+        result = await db.execute(select(User).where(
+            User.id == user_pk,
+            User.is_deleted == False  # ✅ 탈퇴한 유저는 인증 실패 처리
+        ))
+        user = result.scalars().first()
 
-    if user is None:
+        if user is None:
+            raise credentials_exception
+
+        principal = UserInfo(
+            id=user.id,
+            user_id=user.user_id,
+            nickname=user.nickname,
+            is_admin=user.is_admin,
+            is_banned=user.is_banned
+        )
+        principal_cache.set(user_pk, principal)
+
+    if principal.user_id != user_id:
         raise credentials_exception
 
-    if user.is_banned:
+    if principal.is_banned:
         raise HTTPException(status_code=403, detail="정지된 계정은 접근할 수 없습니다.")
 
-    return UserInfo(
-        id=user.id,
-        user_id=user.user_id,
-        nickname=user.nickname,
-        is_admin=user.is_admin,
-        is_banned=user.is_banned
-    )
+    return principal
 
 # ✏️ 닉네임 변경 API
 @router.put("/change-nickname")
-def change_nickname(new_nickname: str, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def change_nickname(new_nickname: str, db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=401,
         detail="사용자 인증에 실패했습니다.",
@@ -164,13 +200,15 @@ def change_nickname(new_nickname: str, db: Session = Depends(get_db), token: str
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_pk, User.user_id == user_id).first()
+    result = await db.execute(select(User).where(User.id == user_pk, User.user_id == user_id))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
 
     user.nickname = new_nickname
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_principal(user.id)
+    invalidate_author_responses()
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -1,50 +1,75 @@
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Query, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Query, Depends, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
-import os
-import uuid
 
-from database import get_db
-from models import Comment, Post, Notification, User
+from database import get_async_db
+from upload_service import save_upload, release_upload
+from image_variants import variant_urls
+from models import Comment, Post, Notification
 from schemas import CommentResponse
-from routes.auth import get_current_user, UserInfo
+from routes.auth import get_current_user, get_optional_user, UserInfo
+from routes.admin import verify_admin
+from query_stats import query_budget
+from routes.notifications import publish_notification
+from notification_service import add_notification, delete_comment_notifications
+from post_stats import on_comment_added, on_comments_removed
+from response_cache import invalidate_post_responses
+from comment_tree import (
+    DELETED_NICKNAME, COMMENT_COLUMNS, COMMENT_PAGE_SIZE, COMMENT_REPLY_PREVIEW,
+    render_comment_tree, invalidate_comment_tree, load_thread_page, load_replies, comment_row_to_dict, dumps,
+)
+from pagination import encode_cursor, decode_id_cursor, ndjson_response
 
 router = APIRouter(
     prefix="/comments",
     tags=["comments"]
 )
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# 🧾 ORM 객체 → 응답 모델 (AsyncSession에서는 replies 지연 로딩을 할 수 없으므로 컬럼만 사용)
+def to_comment_response(comment: Comment, replies: list = None) -> CommentResponse:
+    return CommentResponse(
+        id=comment.id,
+        post_id=comment.post_id,
+        content=comment.content,
+        image_url=comment.image_url,
+        image_variants=variant_urls(comment.image_url),
+        parent_id=comment.parent_id,
+        created_at=comment.created_at,
+        user_id=comment.user_id,
+        nickname=comment.nickname or DELETED_NICKNAME,
+        replies=replies or []
+    )
+
+async def _get_comment(db: AsyncSession, *conditions) -> Comment:
+    result = await db.execute(select(Comment).where(*conditions))
+    return result.scalars().first()
 
 # ✅ 댓글 작성
-@router.post("/", response_model=CommentResponse)
+@router.post("/", response_model=CommentResponse, dependencies=[Depends(query_budget(12))])
 async def create_comment(
     content: str = Form(...),
     post_id: int = Form(...),
     parent_id: Optional[int] = Form(None),
     file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    # 알림 대상 확인에 필요한 컬럼만 읽음 (본문 TEXT 컬럼을 읽지 않음)
+    post = (await db.execute(select(Post.id, Post.owner_id).where(Post.id == post_id))).first()
     if not post:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
 
+    parent_comment = None
     if parent_id:
-        parent_comment = db.query(Comment).filter(Comment.id == parent_id).first()
+        parent_comment = await _get_comment(db, Comment.id == parent_id)
         if not parent_comment:
             raise HTTPException(status_code=404, detail="부모 댓글을 찾을 수 없습니다.")
 
     image_url = None
     if file:
-        ext = file.filename.split(".")[-1]
-        filename = f"{uuid.uuid4().hex}.{ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        with open(filepath, "wb") as buffer:
-            buffer.write(await file.read())
-        image_url = f"/uploads/{filename}"
+        image_url = (await save_upload(db, file)).url
 
     new_comment = Comment(
         content=content,
@@ -57,13 +82,14 @@ async def create_comment(
     )
 
     db.add(new_comment)
-    db.flush()
+    await db.flush()
+    await on_comment_added(db, post_id, new_comment.created_at)
 
     # 🔔 알림 생성
+    notification = None
     if parent_id:
-        parent_comment = db.query(Comment).filter(Comment.id == parent_id).first()
         if parent_comment and parent_comment.user_id != current_user.id:
-            db.add(Notification(
+            notification = Notification(
                 user_id=parent_comment.user_id,
                 type="reply_on_comment",
                 message=f"{current_user.nickname}님이 대댓글을 남겼습니다.",
@@ -71,97 +97,113 @@ async def create_comment(
                 comment_id=new_comment.id,
                 is_read=False,
                 created_at=datetime.utcnow()
-            ))
+            )
     else:
-        post_owner = db.query(User).filter(User.user_id == post.user_id).first()
-        if post_owner and post_owner.id != current_user.id:
-            db.add(Notification(
-                user_id=post_owner.id,
+        if post.owner_id != current_user.id:
+            notification = Notification(
+                user_id=post.owner_id,
                 type="comment_on_post",
                 message=f"{current_user.nickname}님이 게시글에 댓글을 남겼습니다.",
                 post_id=post.id,
                 comment_id=new_comment.id,
                 is_read=False,
                 created_at=datetime.utcnow()
-            ))
+            )
+    if notification is not None:
+        await add_notification(db, notification)
 
-    db.commit()
-    db.refresh(new_comment)
-    return new_comment
+    await db.commit()
+    invalidate_comment_tree(post_id)
+    invalidate_post_responses(post_id)
+    if notification is not None:
+        publish_notification(notification)
+    return to_comment_response(new_comment)
 
 # ✅ 댓글 트리 조회
-@router.get("/{post_id}", response_model=List[CommentResponse])
-def get_comments(post_id: int, db: Session = Depends(get_db)):
-    all_comments = db.query(Comment).filter(Comment.post_id == post_id).all()
-
-    for comment in all_comments:
-        if not comment.nickname:
-            comment.nickname = "탈퇴한 사용자"
-
-    comment_dict = {comment.id: comment for comment in all_comments}
-    root_comments = []
-
-    for comment in all_comments:
-        comment.replies = []
+@router.get("/{post_id}", response_model=List[CommentResponse], dependencies=[Depends(query_budget(1))])
+async def get_comments(post_id: int, db: AsyncSession = Depends(get_async_db)):
+    # 필요한 컬럼만 튜플로 읽어 트리를 만들고 바로 JSON으로 직렬화 (게시글별 캐시)
+    body = await render_comment_tree(db, post_id)
+    return Response(content=body, media_type="application/json")
 
-    for comment in all_comments:
-        if comment.parent_id:
-            parent = comment_dict.get(comment.parent_id)
-            if parent:
-                parent.replies.append(comment)
-        else:
-            root_comments.append(comment)
+# ✅ 댓글 페이지 조회 (최상위 댓글 cursor 페이지 + 대댓글 미리보기)
+# 응답: {"comments": [... "replies", "reply_count", "next_reply_cursor"], "next_cursor"}
+@router.get("/{post_id}/threads", dependencies=[Depends(query_budget(3))])
+async def get_comment_threads(
+    post_id: int,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=100),
+    reply_preview: int = Query(COMMENT_REPLY_PREVIEW, ge=0, le=20),
+    db: AsyncSession = Depends(get_async_db)
+):
+    page = await load_thread_page(db, post_id, cursor, limit, reply_preview)
+    return Response(content=dumps(page), media_type="application/json")
 
-    return root_comments
+# ✅ 대댓글 더 보기
+# 응답: {"replies": [...], "next_cursor"}
+@router.get("/replies/{parent_id}", dependencies=[Depends(query_budget(2))])
+async def get_replies(
+    parent_id: int,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    parent = (await db.execute(select(Comment.post_id).where(Comment.id == parent_id))).first()
+    if not parent:
+        raise HTTPException(status_code=404, detail="부모 댓글을 찾을 수 없습니다.")
+    page = await load_replies(db, parent.post_id, parent_id, cursor, limit)
+    return Response(content=dumps(page), media_type="application/json")
 
 # ✅ 댓글 삭제
 @router.delete("/{comment_id}")
-def delete_comment(
+async def delete_comment(
     comment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await _get_comment(db, Comment.id == comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="댓글을 찾을 수 없습니다.")
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="댓글 삭제 권한이 없습니다.")
 
     # 🔁 관련 알림 먼저 삭제
-    db.query(Notification).filter(Notification.comment_id == comment.id).delete()
+    await delete_comment_notifications(db, [comment.id])
 
-    if comment.image_url:
-        image_path = os.path.join(UPLOAD_DIR, os.path.basename(comment.image_url))
-        if os.path.exists(image_path):
-            os.remove(image_path)
+    await release_upload(db, comment.image_url)
 
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.flush()
+    await on_comments_removed(db, comment.post_id)
+    await db.commit()
+    invalidate_comment_tree(comment.post_id)
+    invalidate_post_responses(comment.post_id)
     return {"message": "✅ 댓글이 삭제되었습니다."}
 
 # ✅ 대댓글 삭제
 @router.delete("/reply/{comment_id}")
-def delete_reply(
+async def delete_reply(
     comment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    comment = db.query(Comment).filter(Comment.id == comment_id, Comment.parent_id != None).first()
+    comment = await _get_comment(db, Comment.id == comment_id, Comment.parent_id != None)
     if not comment:
         raise HTTPException(status_code=404, detail="대댓글을 찾을 수 없습니다.")
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="대댓글 삭제 권한이 없습니다.")
 
     # 🔁 관련 알림 먼저 삭제
-    db.query(Notification).filter(Notification.comment_id == comment.id).delete()
+    await delete_comment_notifications(db, [comment.id])
 
-    if comment.image_url:
-        image_path = os.path.join(UPLOAD_DIR, os.path.basename(comment.image_url))
-        if os.path.exists(image_path):
-            os.remove(image_path)
+    await release_upload(db, comment.image_url)
 
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.flush()
+    await on_comments_removed(db, comment.post_id)
+    await db.commit()
+    invalidate_comment_tree(comment.post_id)
+    invalidate_post_responses(comment.post_id)
     return {"message": "✅ 대댓글이 삭제되었습니다."}
 
 # ✅ 댓글 수정
@@ -170,10 +212,10 @@ async def update_comment(
     comment_id: int,
     content: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await _get_comment(db, Comment.id == comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="댓글을 찾을 수 없습니다.")
     if comment.user_id != current_user.id:
@@ -183,36 +225,51 @@ async def update_comment(
         comment.content = content
 
     if file:
-        if comment.image_url:
-            old_path = os.path.join(UPLOAD_DIR, os.path.basename(comment.image_url))
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        ext = file.filename.split(".")[-1]
-        filename = f"{uuid.uuid4().hex}.{ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        with open(filepath, "wb") as buffer:
-            buffer.write(await file.read())
-        comment.image_url = f"/uploads/{filename}"
-
-    db.commit()
-    db.refresh(comment)
-    return comment
+        stored = await save_upload(db, file)
+        await release_upload(db, comment.image_url)
+        comment.image_url = stored.url
+
+    await db.commit()
+    invalidate_comment_tree(comment.post_id)
+    return to_comment_response(comment)
 
 # ✅ 댓글 ID로 조회
 @router.get("/comment/{comment_id}", response_model=CommentResponse)
-def get_comment_by_id(comment_id: int, db: Session = Depends(get_db)):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+async def get_comment_by_id(comment_id: int, db: AsyncSession = Depends(get_async_db)):
+    comment = await _get_comment(db, Comment.id == comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="댓글을 찾을 수 없습니다.")
-    if not comment.nickname:
-        comment.nickname = "탈퇴한 사용자"
-    return comment
+    return to_comment_response(comment)
 
-# ✅ 전체 댓글 목록 조회
+# ✅ 전체 댓글 목록 조회 (id 순 keyset 페이지, 다음 페이지 커서는 X-Next-Cursor 헤더)
+# format=ndjson이면 cursor 이후 전체를 한 줄에 댓글 하나씩 스트리밍 (관리 도구용)
+# 한 페이지(최대 500개) 조회는 누구나 가능, 전체를 끝까지 내보내는 ndjson은 관리자만 가능
 @router.get("/", response_model=List[CommentResponse])
-def get_all_comments(db: Session = Depends(get_db)):
-    comments = db.query(Comment).all()
-    for c in comments:
-        if not c.nickname:
-            c.nickname = "탈퇴한 사용자"
+async def get_all_comments(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    post_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[UserInfo] = Depends(get_optional_user)
+):
+    after_id = decode_id_cursor(cursor)
+    query = select(*COMMENT_COLUMNS)
+    if post_id is not None:
+        query = query.where(Comment.post_id == post_id)
+    if user_id is not None:
+        query = query.where(Comment.user_id == user_id)
+
+    if format == "ndjson":
+        if current_user is None:
+            raise HTTPException(status_code=401, detail="로그인이 필요합니다.", headers={"WWW-Authenticate": "Bearer"})
+        verify_admin(current_user)
+        return ndjson_response(query, Comment.id, comment_row_to_dict, after_id)
+
+    result = await db.execute(query.where(Comment.id > after_id).order_by(Comment.id).limit(limit))
+    comments = [comment_row_to_dict(row) for row in result.all()]
+    if len(comments) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([comments[-1]["id"]])
     return comments
@@ -0,0 +1,19 @@
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from metrics import METRICS_ENABLED, METRICS_TOKEN, render_metrics
+
+router = APIRouter()
+
+# 📈 Prometheus 수집용 메트릭 (METRICS_TOKEN을 설정하면 Authorization: Bearer <토큰> 필요)
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, METRICS_TOKEN):
+            raise HTTPException(status_code=401, detail="메트릭 조회 권한이 없습니다.")
+    return PlainTextResponse(await render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
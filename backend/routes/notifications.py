@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, Response
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, AsyncSessionLocal
 from models import Notification
-from routes.auth import get_current_user, UserInfo
+from routes.auth import get_current_user, UserInfo, authenticate_token
+from query_stats import query_budget
+from notification_hub import hub, NOTIFY_HEARTBEAT_SECONDS
+from notification_service import (
+    mark_notifications_read, mark_all_notifications_read,
+    delete_user_notifications, delete_all_user_notifications, get_unread_count,
+)
+from pagination import encode_cursor, decode_cursor
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
@@ -25,28 +34,78 @@ class NotificationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+async def _get_my_notification(db: AsyncSession, notification_id: int, user_id: int) -> Notification:
+    result = await db.execute(select(Notification).where(
+        Notification.id == notification_id,
+        Notification.user_id == user_id
+    ))
+    return result.scalars().first()
+
+# 📡 실시간 알림 이벤트 발행 (commit 이후에 호출)
+def publish_notification(notification: Notification):
+    payload = NotificationResponse.model_validate(notification).model_dump(mode="json")
+    hub.publish(notification.user_id, {"event": "notification", "data": payload})
+
+def publish_read(user_id: int, notification_id: Optional[int] = None):
+    # notification_id가 없으면 전체 읽음
+    hub.publish(user_id, {"event": "read", "id": notification_id})
+
+def publish_deleted(user_id: int, notification_id: Optional[int] = None):
+    # notification_id가 없으면 전체 삭제
+    hub.publish(user_id, {"event": "deleted", "id": notification_id})
+
 # ✅ 내 알림 목록 조회
-@router.get("/", response_model=List[NotificationResponse])
-def get_my_notifications(
-    db: Session = Depends(get_db),
+# - 기본: 최신순으로 limit개, 다음 페이지 커서는 X-Next-Cursor 헤더로 전달 (?cursor=...)
+# - since_id: 해당 ID 이후에 생긴 알림만 오래된 순으로 반환 (폴링/재연결 시 증분 조회)
+# - unread_only: 안 읽은 알림만
+@router.get("/", response_model=List[NotificationResponse], dependencies=[Depends(query_budget(2))])
+async def get_my_notifications(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    since_id: Optional[int] = Query(None, ge=0, description="이 ID 이후의 새 알림만 조회"),
+    unread_only: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    notifs = db.query(Notification).filter(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()).all()
-    return notifs
+    if cursor and since_id is not None:
+        raise HTTPException(status_code=400, detail="cursor와 since_id는 함께 사용할 수 없습니다.")
+
+    query = select(Notification).where(Notification.user_id == current_user.id)
+    if unread_only:
+        query = query.where(Notification.is_read == False)
+
+    if since_id is not None:
+        query = query.where(Notification.id > since_id).order_by(Notification.id)
+        result = await db.execute(query.limit(limit))
+        return result.scalars().all()
+
+    if cursor:
+        _, (cursor_created_at, cursor_id) = decode_cursor(cursor, datetime_fields=(0,), size=2)
+        query = query.where(or_(
+            Notification.created_at < cursor_created_at,
+            and_(Notification.created_at == cursor_created_at, Notification.id < cursor_id)
+        ))
+
+    result = await db.execute(
+        query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit)
+    )
+    notifications = result.scalars().all()
+    if len(notifications) == limit:
+        last = notifications[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last.created_at, last.id])
+    return notifications
 
 from fastapi import Path
 
 # ✅ 알림 읽음 처리
 @router.patch("/read/{notification_id}")
-def mark_notification_as_read(
+async def mark_notification_as_read(
     notification_id: int = Path(..., description="읽음 처리할 알림의 ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    notification = await _get_my_notification(db, notification_id, current_user.id)
 
     if not notification:
         raise HTTPException(status_code=404, detail="알림을 찾을 수 없습니다.")
@@ -54,77 +113,136 @@ def mark_notification_as_read(
     if notification.is_read:
         return {"message": "이미 읽은 알림입니다."}
 
-    notification.is_read = True
-    db.commit()
+    await mark_notifications_read(db, current_user.id, notification_id)
+    await db.commit()
+    publish_read(current_user.id, notification_id)
     return {"message": "✅ 알림이 읽음 처리되었습니다."}
 
 # ✅ 전체 알림 읽음 처리
 @router.patch("/read-all")
-def mark_all_notifications_as_read(
-    db: Session = Depends(get_db),
+async def mark_all_notifications_as_read(
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).all()
-
-    for notif in notifications:
-        notif.is_read = True
-
-    db.commit()
+    # 청크 단위 UPDATE + commit은 서비스에서 처리
+    updated = await mark_all_notifications_read(db, current_user.id)
+    publish_read(current_user.id)
     return {
         "message": "✅ 모든 알림이 읽음 처리되었습니다.",
-        "updated": len(notifications)
+        "updated": updated
     }
 
 # ✅ 읽지 않은 알림 개수 조회
-@router.get("/unread-count")
-def get_unread_notification_count(
-    db: Session = Depends(get_db),
+@router.get("/unread-count", dependencies=[Depends(query_budget(2))])
+async def get_unread_notification_count(
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
+    # users.unread_notification_count를 PK로 바로 읽음 (COUNT(*) 없음)
+    count = await get_unread_count(db, current_user.id)
     return {"unread_count": count}
 
 # ✅ 전체 알림 삭제
 @router.delete("/all")
-def delete_all_notifications(
-    db: Session = Depends(get_db),
+async def delete_all_notifications(
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    deleted_count = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).delete()
-
-    db.commit()
+    deleted_count = await delete_all_user_notifications(db, current_user.id)
+    publish_deleted(current_user.id)
 
     return {"message": f"✅ 모든 알림이 삭제되었습니다. (총 {deleted_count}개)"}
 
 # ✅ 개별 알림 삭제
 @router.delete("/{notification_id}")
-def delete_notification(
+async def delete_notification(
     notification_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    notification = await _get_my_notification(db, notification_id, current_user.id)
 
     if not notification:
         raise HTTPException(status_code=404, detail="알림을 찾을 수 없습니다.")
 
-    db.delete(notification)
-    db.commit()
+    await delete_user_notifications(db, current_user.id, notification_id)
+    await db.commit()
+    publish_deleted(current_user.id, notification_id)
 
     return {"message": "✅ 알림이 삭제되었습니다."}
 
-
-
-
-
+# 📡 실시간 알림 WebSocket
+# ws://.../notifications/ws?token=<JWT>&last_id=<마지막으로 받은 알림 ID>
+# - 연결 직후 last_id 이후의 알림을 먼저 보내고(재연결 시 놓친 알림 보충), 이후 새 알림을 push
+# - 이벤트가 없으면 NOTIFY_HEARTBEAT_SECONDS마다 {"event": "ping"} 전송
+NOTIFY_RESUME_LIMIT = 100
+
+@router.websocket("/ws")
+async def notifications_ws(
+    websocket: WebSocket,
+    token: str = Query(...),
+    last_id: Optional[int] = Query(None, ge=0)
+):
+    # 연결 내내 DB 세션을 잡고 있지 않도록 인증/보충 조회에만 짧게 사용
+    async with AsyncSessionLocal() as db:
+        try:
+            current_user = await authenticate_token(db, token)
+        except HTTPException:
+            await websocket.close(code=1008)
+            return
+
+    await websocket.accept()
+    # 보충 조회 전에 구독해야 그 사이에 생긴 알림을 놓치지 않음 (중복은 ID로 거름)
+    subscription = hub.subscribe(current_user.id)
+    receiver = asyncio.create_task(_drain_client(websocket))
+    try:
+        sent_id = last_id or 0
+        if last_id is not None:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Notification)
+                    .where(Notification.user_id == current_user.id, Notification.id > last_id)
+                    .order_by(Notification.id)
+                    .limit(NOTIFY_RESUME_LIMIT)
+                )
+                missed = result.scalars().all()
+            for notification in missed:
+                payload = NotificationResponse.model_validate(notification).model_dump(mode="json")
+                await websocket.send_json({"event": "notification", "data": payload})
+                sent_id = notification.id
+            if len(missed) == NOTIFY_RESUME_LIMIT:
+                # 너무 많이 밀렸으면 목록을 다시 받도록 알림
+                await websocket.send_json({"event": "resync"})
+
+        while not receiver.done():
+            next_event = asyncio.create_task(subscription.next_event(NOTIFY_HEARTBEAT_SECONDS))
+            await asyncio.wait({next_event, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_event.done():
+                next_event.cancel()
+                break
+            try:
+                event = next_event.result()
+            except asyncio.TimeoutError:
+                await websocket.send_json({"event": "ping"})
+                continue
+            if event is None:
+                # 큐가 넘침 → 끊고 클라이언트가 last_id로 다시 연결
+                await websocket.close(code=1013)
+                break
+            if event["event"] == "notification":
+                if event["data"]["id"] <= sent_id:
+                    continue
+                sent_id = event["data"]["id"]
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(subscription)
+        receiver.cancel()
+
+async def _drain_client(websocket: WebSocket):
+    # 클라이언트 메시지(pong 등)는 무시하고 연결 종료만 감지
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
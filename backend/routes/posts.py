@@ -1,175 +1,296 @@
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Query, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Query, Depends, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 import os
-import uuid
 import math
-from database import get_connection
+from database import get_async_db
+from upload_service import save_upload, release_upload
+from notification_service import delete_post_notifications
+from comment_tree import invalidate_comment_tree
+from image_variants import variant_urls
+from cache import TTLCache
+from pagination import encode_cursor, decode_cursor
+from response_cache import cached_json, invalidate_post_responses, post_tag, POST_LIST_TAG, POST_AUTHORS_TAG
 from routes.auth import get_current_user, UserInfo
+from query_stats import query_budget
 from pydantic import BaseModel
 
 router = APIRouter()
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 class PostBase(BaseModel):
     title: str
     content: str
     image_url: Optional[str] = None
 
+def _to_post(row) -> dict:
+    # 🖼 클라이언트가 표시 크기에 맞는 이미지를 고를 수 있도록 변형 이미지 URL 추가
+    post = dict(row)
+    post["image_variants"] = variant_urls(post.get("image_url"))
+    return post
+
+async def _fetch_post(db: AsyncSession, post_id: int) -> Optional[dict]:
+    result = await db.execute(text("SELECT * FROM posts WHERE id = :post_id"), {"post_id": post_id})
+    row = result.mappings().first()
+    return _to_post(row) if row else None
+
 # ✅ 게시글 작성
 @router.post("/posts/")
 async def create_post_with_image(
     title: str = Form(...),
     content: str = Form(...),
     file: UploadFile = File(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        image_url = None
-
-        if file:
-            ext = file.filename.split(".")[-1]
-            filename = f"{uuid.uuid4().hex}.{ext}"
-            filepath = os.path.join(UPLOAD_DIR, filename)
-            with open(filepath, "wb") as buffer:
-                buffer.write(await file.read())
-            image_url = f"/uploads/{filename}"
-
-        try:
-            insert_query = "INSERT INTO posts (title, content, nickname, user_id, image_url) VALUES (%s, %s, %s, %s, %s)"
-            cursor.execute(insert_query, (title, content, current_user.nickname, current_user.user_id, image_url))
-            conn.commit()
-            post_id = cursor.lastrowid
-            cursor.execute("SELECT * FROM posts WHERE id = %s", (post_id,))
-            return cursor.fetchone()
-        except Exception as e:
-            conn.rollback()
-            raise HTTPException(status_code=500, detail=f"게시글 추가 실패: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
-    raise HTTPException(status_code=500, detail="데이터베이스 연결 실패")
-
-# ✅ 게시글 목록 조회
-@router.get("/posts/")
-def get_posts(
+    image_url = None
+
+    if file:
+        image_url = (await save_upload(db, file)).url
+
+    try:
+        insert_query = text(
+            "INSERT INTO posts (title, content, nickname, owner_id, user_id, image_url) "
+            "VALUES (:title, :content, :nickname, :owner_id, :user_id, :image_url)"
+        )
+        result = await db.execute(insert_query, {
+            "title": title,
+            "content": content,
+            "nickname": current_user.nickname,
+            "owner_id": current_user.id,
+            "user_id": current_user.user_id,
+            "image_url": image_url
+        })
+        await db.commit()
+        invalidate_post_caches()
+        return await _fetch_post(db, result.lastrowid)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"게시글 추가 실패: {str(e)}")
+
+# 📌 정렬 기준별 (정렬 컬럼, 방향, 결과 행의 키 이름) — 마지막 키는 항상 id (동률 정렬용)
+ORDER_KEYS = {
+    "newest": [("p.created_at", "DESC", "created_at"), ("p.id", "DESC", "id")],
+    "oldest": [("p.created_at", "ASC", "created_at"), ("p.id", "ASC", "id")],
+    "title": [("p.title", "ASC", "title"), ("p.id", "ASC", "id")],
+    "active": [("p.last_activity_at", "DESC", "last_activity_at"), ("p.id", "DESC", "id")],  # 작성/댓글 최신순
+}
+_DATETIME_KEYS = {"created_at", "last_activity_at"}
+
+# 🧮 게시글 수 캐시 (검색어별 total_count, 게시글 작성/수정/삭제 시 무효화)
+POST_COUNT_CACHE_TTL = float(os.getenv("POST_COUNT_CACHE_TTL", "30"))
+post_count_cache = TTLCache(maxsize=256, ttl=POST_COUNT_CACHE_TTL, name="post_count")
+
+def invalidate_post_counts():
+    post_count_cache.clear()
+
+async def _count_posts(db: AsyncSession, where_sql: str, params: dict, keyword: Optional[str]) -> int:
+    total_count = post_count_cache.get(keyword)
+    if total_count is None:
+        result = await db.execute(text(f"SELECT COUNT(*) AS total FROM posts p {where_sql}"), params)
+        total_count = result.scalar_one()
+        post_count_cache.set(keyword, total_count)
+    return total_count
+
+def _keyset_condition(keys: list, direction: str) -> str:
+    """
+    (정렬키, id) 튜플 비교를 인덱스를 탈 수 있는 OR 형태로 풀어 씀
+    예) newest 다음 페이지: p.created_at < :cursor_key OR (p.created_at = :cursor_key AND p.id < :cursor_id)
+    """
+    (col, sort, _), (id_col, _, _) = keys
+    forward = (sort == "DESC") == (direction == "next")
+    op = "<" if forward else ">"
+    return f"({col} {op} :cursor_key OR ({col} = :cursor_key AND {id_col} {op} :cursor_id))"
+
+# 🔍 검색 방식: fulltext (posts.title/content FULLTEXT ngram 인덱스 사용) 또는 like
+# FULLTEXT 인덱스는 MySQL에만 만들어지므로 다른 DB(SQLite 등)에서는 설정과 관계없이 LIKE 사용
+POST_SEARCH_MODE = os.getenv("POST_SEARCH_MODE", "fulltext")
+NGRAM_TOKEN_SIZE = int(os.getenv("NGRAM_TOKEN_SIZE", "2"))  # MySQL ngram_token_size와 동일하게 설정
+
+def _search_clause(keyword: str, dialect: str) -> tuple:
+    """
+    검색어에 맞는 (WHERE 조건, 파라미터, 관련도 SELECT 식)을 반환
+    ngram 토큰보다 짧은 검색어는 FULLTEXT로 찾을 수 없으므로 LIKE로 처리
+    """
+    term = keyword.strip()
+    if POST_SEARCH_MODE == "fulltext" and dialect == "mysql" and len(term) >= NGRAM_TOKEN_SIZE:
+        # 큰따옴표로 감싸 구문 검색 (LIKE '%kw%'와 같은 결과), 불리언 연산자는 무시
+        phrase = '"' + term.replace('"', " ") + '"'
+        match = "MATCH(p.title, p.content) AGAINST (:search IN BOOLEAN MODE)"
+        return match, {"search": phrase}, match
+    return "(p.title LIKE :search OR p.content LIKE :search)", {"search": f"%{keyword}%"}, None
+
+def invalidate_post_caches(post_id: Optional[int] = None):
+    """
+    게시글 수 캐시 + 목록(과 post_id 게시글) 응답 캐시 무효화
+    """
+    invalidate_post_counts()
+    invalidate_post_responses(post_id)
+
+# ✅ 게시글 목록 조회 (응답 캐시 + ETag/304)
+@router.get("/posts/", dependencies=[Depends(query_budget(2))])
+async def get_posts(
+    request: Request,
     page: int = Query(1, ge=1),
-    page_size: int = Query(10, le=100),
+    page_size: int = Query(10, ge=1, le=100),
     keyword: Optional[str] = Query(None),
-    order: str = Query("newest", enum=["newest", "oldest", "title"])
+    order: str = Query("newest", enum=["newest", "oldest", "title", "active", "relevance"]),
+    pagination: str = Query("offset", enum=["offset", "cursor"]),
+    cursor: Optional[str] = Query(None, description="커서 페이지네이션: 이전 응답의 next_cursor/prev_cursor"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        order_by = {
-            "newest": "p.created_at DESC",
-            "oldest": "p.created_at ASC",
-            "title": "p.title ASC"
-        }[order]
+    return await cached_json(
+        request, [POST_LIST_TAG],
+        lambda: _list_posts(db, page, page_size, keyword, order, pagination, cursor)
+    )
+
+async def _list_posts(
+    db: AsyncSession,
+    page: int,
+    page_size: int,
+    keyword: Optional[str],
+    order: str,
+    pagination: str,
+    cursor: Optional[str]
+) -> dict:
+    use_cursor = pagination == "cursor" or cursor is not None
+
+    where_clauses = []
+    where_params = {}
+    score_sql = None
+    if keyword:
+        search_sql, where_params, score_sql = _search_clause(keyword, db.bind.dialect.name)
+        where_clauses.append(search_sql)
+
+    # 관련도순은 검색어가 있을 때만 의미가 있음 (없으면 최신순)
+    by_relevance = order == "relevance" and score_sql is not None
+    if by_relevance and use_cursor:
+        raise HTTPException(status_code=400, detail="관련도순 정렬은 커서 페이지네이션을 지원하지 않습니다.")
+    keys = ORDER_KEYS.get(order, ORDER_KEYS["newest"])
+
+    direction = "next"
+    params = dict(where_params)
+    if use_cursor and cursor:
+        direction, values = decode_cursor(cursor, datetime_fields=(0,) if keys[0][2] in _DATETIME_KEYS else (), size=2)
+        where_clauses.append(_keyset_condition(keys, direction))
+        params.update({"cursor_key": values[0], "cursor_id": values[1]})
+
+    # 이전 페이지는 정렬을 뒤집어서 가져온 뒤 다시 뒤집음
+    reverse = direction == "prev"
+    if by_relevance:
+        order_by = "relevance DESC, p.id DESC"
+    else:
+        order_by = ", ".join(
+            f"{col} {('ASC' if sort == 'DESC' else 'DESC') if reverse else sort}" for col, sort, _ in keys
+        )
+    score_column = f", {score_sql} AS relevance" if by_relevance else ""
+    where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    query = f"""
+        SELECT p.*,
+            CASE WHEN u.is_deleted = 1 THEN '탈퇴한 사용자' ELSE u.nickname END AS nickname{score_column}
+        FROM posts p
+        LEFT JOIN users u ON u.id = p.owner_id
+        {where_sql}
+        ORDER BY {order_by}
+        LIMIT :limit
+    """
+
+    if use_cursor:
+        # 한 건 더 읽어서 다음(이전) 페이지 존재 여부 판단
+        result = await db.execute(text(query), {**params, "limit": page_size + 1})
+        posts = [_to_post(row) for row in result.mappings()]
+        has_more = len(posts) > page_size
+        posts = posts[:page_size]
+        if reverse:
+            posts.reverse()
+    else:
         offset = (page - 1) * page_size
+        result = await db.execute(text(query + " OFFSET :offset"), {**params, "limit": page_size, "offset": offset})
+        posts = [_to_post(row) for row in result.mappings()]
 
-        if keyword:
-            query = f"""
-                SELECT p.*, 
-                    CASE WHEN u.is_deleted = 1 THEN '탈퇴한 사용자' ELSE u.nickname END AS nickname
-                FROM posts p
-                LEFT JOIN users u ON p.user_id = u.user_id
-                WHERE p.title LIKE %s OR p.content LIKE %s
-                ORDER BY {order_by}
-                LIMIT %s OFFSET %s
-            """
-            cursor.execute(query, (f"%{keyword}%", f"%{keyword}%", page_size, offset))
-        else:
-            query = f"""
-                SELECT p.*, 
-                    CASE WHEN u.is_deleted = 1 THEN '탈퇴한 사용자' ELSE u.nickname END AS nickname
-                FROM posts p
-                LEFT JOIN users u ON p.user_id = u.user_id
-                ORDER BY {order_by}
-                LIMIT %s OFFSET %s
-            """
-            cursor.execute(query, (page_size, offset))
-        posts = cursor.fetchall()
-
-        if keyword:
-            count_query = "SELECT COUNT(*) AS total FROM posts WHERE title LIKE %s OR content LIKE %s"
-            cursor.execute(count_query, (f"%{keyword}%", f"%{keyword}%"))
-        else:
-            cursor.execute("SELECT COUNT(*) AS total FROM posts")
-        total_count = cursor.fetchone()["total"]
-        total_pages = math.ceil(total_count / page_size)
-
-        cursor.close()
-        conn.close()
+    count_where = f"WHERE {where_clauses[0]}" if keyword else ""
+    total_count = await _count_posts(db, count_where, where_params, keyword)
+    total_pages = math.ceil(total_count / page_size)
 
+    if use_cursor:
+        has_next = has_more if direction == "next" else True
+        has_prev = has_more if direction == "prev" else cursor is not None
+        key_names = [name for _, _, name in keys]
+        next_cursor = prev_cursor = None
+        if posts and has_next:
+            next_cursor = encode_cursor([posts[-1][k] for k in key_names], "next")
+        if posts and has_prev:
+            prev_cursor = encode_cursor([posts[0][k] for k in key_names], "prev")
         return {
             "posts": posts,
             "total_count": total_count,
             "total_pages": total_pages,
-            "current_page": page,
-            "page_size": page_size
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
         }
 
-    raise HTTPException(status_code=500, detail="데이터베이스 연결 실패")
-
-# ✅ 게시글 단일 조회
-@router.get("/posts/{post_id}")
-def get_post(post_id: int):
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT p.*, 
-                CASE WHEN u.is_deleted = 1 THEN '탈퇴한 사용자' ELSE u.nickname END AS nickname
-            FROM posts p
-            LEFT JOIN users u ON p.user_id = u.user_id
-            WHERE p.id = %s
-        """
-        cursor.execute(query, (post_id,))
-        post = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        if post:
-            return post
-        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-    raise HTTPException(status_code=500, detail="데이터베이스 연결 실패")
+    return {
+        "posts": posts,
+        "total_count": total_count,
+        "total_pages": total_pages,
+        "current_page": page,
+        "page_size": page_size
+    }
+
+# ✅ 게시글 단일 조회 (응답 캐시 + ETag/304)
+@router.get("/posts/{post_id}", dependencies=[Depends(query_budget(1))])
+async def get_post(request: Request, post_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await cached_json(request, [post_tag(post_id), POST_AUTHORS_TAG], lambda: _load_post(db, post_id))
+
+async def _load_post(db: AsyncSession, post_id: int) -> dict:
+    query = text("""
+        SELECT p.*,
+            CASE WHEN u.is_deleted = 1 THEN '탈퇴한 사용자' ELSE u.nickname END AS nickname
+        FROM posts p
+        LEFT JOIN users u ON u.id = p.owner_id
+        WHERE p.id = :post_id
+    """)
+    result = await db.execute(query, {"post_id": post_id})
+    post = result.mappings().first()
+    if post:
+        return _to_post(post)
+    raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
 
 # ✅ 게시글 삭제
 @router.delete("/posts/{post_id}")
-def delete_post(post_id: int, current_user: UserInfo = Depends(get_current_user)):
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM posts WHERE id = %s", (post_id,))
-        post = cursor.fetchone()
-        if not post:
-            cursor.close()
-            conn.close()
-            raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-        if post["user_id"] != current_user.user_id:
-            cursor.close()
-            conn.close()
-            raise HTTPException(status_code=403, detail="게시글 삭제 권한이 없습니다.")
-        if post["image_url"]:
-            image_path = os.path.join(UPLOAD_DIR, os.path.basename(post["image_url"]))
-            if os.path.exists(image_path):
-                os.remove(image_path)
-        try:
-            cursor.execute("DELETE FROM posts WHERE id = %s", (post_id,))
-            conn.commit()
-            return {"message": "게시글이 삭제되었습니다!"}
-        except Exception as e:
-            conn.rollback()
-            raise HTTPException(status_code=500, detail=f"게시글 삭제 실패: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
-    raise HTTPException(status_code=500, detail="데이터베이스 연결 실패")
+async def delete_post(
+    post_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserInfo = Depends(get_current_user)
+):
+    post = await _fetch_post(db, post_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
+    if post["owner_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="게시글 삭제 권한이 없습니다.")
+    try:
+        # 게시글과 댓글 이미지 참조 해제 (같은 트랜잭션에서 처리)
+        await release_upload(db, post["image_url"])
+        comment_images = await db.execute(
+            text("SELECT image_url FROM comments WHERE post_id = :post_id AND image_url IS NOT NULL"),
+            {"post_id": post_id}
+        )
+        for image_url in comment_images.scalars().all():
+            await release_upload(db, image_url)
+        # 알림 → 댓글 → 게시글 순으로 한 번씩만 삭제 (댓글을 하나씩 지우지 않음)
+        await delete_post_notifications(db, post_id)
+        await db.execute(text("UPDATE comments SET parent_id = NULL WHERE post_id = :post_id"), {"post_id": post_id})
+        await db.execute(text("DELETE FROM comments WHERE post_id = :post_id"), {"post_id": post_id})
+        await db.execute(text("DELETE FROM posts WHERE id = :post_id"), {"post_id": post_id})
+        await db.commit()
+        invalidate_comment_tree(post_id)
+        invalidate_post_caches(post_id)
+        return {"message": "게시글이 삭제되었습니다!"}
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"게시글 삭제 실패: {str(e)}")
 
 # ✅ 게시글 수정
 @router.patch("/posts/{post_id}")
@@ -178,47 +299,28 @@ async def update_post(
     title: Optional[str] = Form(None),
     content: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    conn = get_connection()
-    if conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM posts WHERE id = %s", (post_id,))
-        existing_post = cursor.fetchone()
-        if not existing_post:
-            cursor.close()
-            conn.close()
-            raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-        if existing_post["user_id"] != current_user.user_id:
-            cursor.close()
-            conn.close()
-            raise HTTPException(status_code=403, detail="게시글 수정 권한이 없습니다.")
-
-        updated_title = title or existing_post["title"]
-        updated_content = content or existing_post["content"]
-        updated_image_url = existing_post["image_url"]
-
-        if file:
-            if updated_image_url:
-                old_image_path = os.path.join(UPLOAD_DIR, os.path.basename(updated_image_url))
-                if os.path.exists(old_image_path):
-                    os.remove(old_image_path)
-            ext = file.filename.split(".")[-1]
-            filename = f"{uuid.uuid4().hex}.{ext}"
-            filepath = os.path.join(UPLOAD_DIR, filename)
-            with open(filepath, "wb") as buffer:
-                buffer.write(await file.read())
-            updated_image_url = f"/uploads/{filename}"
-
-        cursor.execute(
-            "UPDATE posts SET title = %s, content = %s, image_url = %s WHERE id = %s",
-            (updated_title, updated_content, updated_image_url, post_id)
-        )
-        conn.commit()
-        cursor.execute("SELECT * FROM posts WHERE id = %s", (post_id,))
-        updated_post = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        return updated_post
-
-    raise HTTPException(status_code=500, detail="데이터베이스 연결 실패")
+    existing_post = await _fetch_post(db, post_id)
+    if not existing_post:
+        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
+    if existing_post["owner_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="게시글 수정 권한이 없습니다.")
+
+    updated_title = title or existing_post["title"]
+    updated_content = content or existing_post["content"]
+    updated_image_url = existing_post["image_url"]
+
+    if file:
+        stored = await save_upload(db, file)
+        await release_upload(db, updated_image_url)
+        updated_image_url = stored.url
+
+    await db.execute(
+        text("UPDATE posts SET title = :title, content = :content, image_url = :image_url WHERE id = :post_id"),
+        {"title": updated_title, "content": updated_content, "image_url": updated_image_url, "post_id": post_id}
+    )
+    await db.commit()
+    invalidate_post_caches(post_id)  # 검색어별 개수도 달라질 수 있음
+    return await _fetch_post(db, post_id)
@@ -1,32 +1,23 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
-import shutil
-import os
-from uuid import uuid4
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from upload_service import save_upload
 
 router = APIRouter()
 
-# 📌 이미지 저장 경로
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 # ✅ 1️⃣ 이미지 업로드 API
 @router.post("/upload/")
-async def upload_image(file: UploadFile = File(...)):
+async def upload_image(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
     try:
-        # 📌 파일 확장자 확인
-        ext = file.filename.split(".")[-1]
-        if ext.lower() not in ["jpg", "jpeg", "png", "gif"]:
-            raise HTTPException(status_code=400, detail="❌ 지원하지 않는 이미지 형식입니다.")
-
-        # 📌 파일 저장 (랜덤 파일명 사용)
-        filename = f"{uuid4().hex}.{ext}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 📌 파일 저장 (청크 단위 스트리밍, 매직 바이트로 형식/크기 검사, 같은 이미지는 한 번만 저장)
+        # 이 API로 올린 이미지는 게시글/댓글에 묶이지 않으므로 참조 1개를 계속 유지함
+        stored = await save_upload(db, file)
+        await db.commit()
 
         # 📌 업로드된 이미지 URL 반환
-        return {"image_url": f"http://127.0.0.1:8001/uploads/{filename}"}
-    
+        return {"image_url": f"http://127.0.0.1:8001{stored.url}"}
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"❌ 이미지 업로드 실패: {str(e)}")
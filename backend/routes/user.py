@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models import User, Post, Comment
-from routes.auth import get_current_user, UserInfo, create_access_token
+from routes.auth import get_current_user, UserInfo, create_access_token, invalidate_principal
+from query_stats import query_budget
+from response_cache import invalidate_author_responses
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -16,18 +19,19 @@ class NicknameUpdate(BaseModel):
 
 # ✅ 닉네임 변경
 @router.patch("/nickname")
-def update_nickname(
+async def update_nickname(
     data: NicknameUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = (await db.execute(select(User).where(User.id == current_user.id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     
     user.nickname = data.nickname
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_principal(user.id)
+    invalidate_author_responses()
 
     # ✅ 닉네임 반영된 새 토큰 발급
     new_token = create_access_token({
@@ -44,16 +48,20 @@ def update_nickname(
     }
 
 # ✍️ 내가 쓴 글 목록 조회
-@router.get("/my-posts")
-def get_my_posts(
+@router.get("/my-posts", dependencies=[Depends(query_budget(3))])
+async def get_my_posts(
     page: int = Query(1, ge=1),
     page_size: int = Query(8, ge=1),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user),
 ):
-    query = db.query(Post).filter(Post.user_id == current_user.user_id)
-    total = query.count()
-    posts = query.order_by(Post.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    condition = Post.owner_id == current_user.id
+    total = (await db.execute(select(func.count(Post.id)).where(condition))).scalar_one()
+    result = await db.execute(
+        select(Post.id, Post.title, Post.created_at).where(condition)
+        .order_by(Post.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
+    )
+    posts = result.all()
 
     result = [
         {
@@ -71,16 +79,20 @@ def get_my_posts(
     }
 
 # 💬 내가 쓴 댓글 목록 조회
-@router.get("/my-comments")
-def get_my_comments(
+@router.get("/my-comments", dependencies=[Depends(query_budget(3))])
+async def get_my_comments(
     page: int = Query(1, ge=1),
     page_size: int = Query(8, ge=1),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserInfo = Depends(get_current_user),
 ):
-    query = db.query(Comment).filter(Comment.user_id == current_user.id)
-    total = query.count()
-    comments = query.order_by(Comment.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    condition = Comment.user_id == current_user.id
+    total = (await db.execute(select(func.count(Comment.id)).where(condition))).scalar_one()
+    result = await db.execute(
+        select(Comment.id, Comment.content, Comment.created_at).where(condition)
+        .order_by(Comment.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
+    )
+    comments = result.all()
 
     result = [
         {
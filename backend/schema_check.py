@@ -0,0 +1,58 @@
+import logging
+import os
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from database import async_engine
+
+# 🧱 DB 스키마 버전 확인 (테이블 생성/변경은 alembic upgrade head로만 함)
+# strict: DB가 최신 리비전이 아니면 서버를 띄우지 않음 / warn: 경고만 남김 / off: 확인하지 않음
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "strict")
+
+_ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic")
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def expected_heads() -> set:
+    """
+    alembic/versions 기준 head 리비전 (DB 연결 없이 마이그레이션 파일만 읽음)
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", _ALEMBIC_DIR)
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def current_revisions() -> set:
+    # alembic_version 테이블이 없으면(마이그레이션을 한 번도 안 한 DB) 빈 집합
+    try:
+        async with async_engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return {row[0] for row in result}
+    except DBAPIError:
+        return set()
+
+
+async def verify_schema_revision():
+    """
+    워커 시작 시 한 번만 실행 (쿼리 1번 + 마이그레이션 파일 읽기)
+    여러 워커가 동시에 마이그레이션하지 않도록 여기서 upgrade는 하지 않음
+    """
+    if SCHEMA_CHECK == "off":
+        return
+    expected = expected_heads()
+    current = await current_revisions()
+    if current == expected:
+        return
+
+    message = (
+        f"DB 스키마 리비전이 최신이 아닙니다 (DB: {', '.join(sorted(current)) or '없음'}, "
+        f"코드: {', '.join(sorted(expected))}). backend 폴더에서 'alembic upgrade head'를 실행해 주세요."
+    )
+    if SCHEMA_CHECK == "strict":
+        raise RuntimeError(message)
+    logger.warning("⚠️ %s", message)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 class CommentCreate(BaseModel):
     post_id: int
@@ -14,6 +14,7 @@ class CommentResponse(BaseModel):
     post_id: int
     content: str
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None  # thumb / medium / webp URL
     parent_id: Optional[int] = None
     created_at: datetime
     user_id: int  # ✅ 수정 완료
@@ -0,0 +1,47 @@
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+
+# 🗂 /uploads 정적 파일 캐시 정책
+# - 내용 해시(sha256) / uuid 이름 파일은 내용이 바뀌지 않으므로 1년 + immutable
+UPLOADS_MAX_AGE = int(os.getenv("UPLOADS_MAX_AGE", str(365 * 24 * 3600)))
+UPLOADS_FALLBACK_MAX_AGE = int(os.getenv("UPLOADS_FALLBACK_MAX_AGE", "3600"))
+
+# <sha256>.<ext>, <sha256>_<변형>.<ext>, <uuid>.<ext>
+_IMMUTABLE_NAME_RE = re.compile(r"^([0-9a-f]{64}(?:_[a-z]+)?|[0-9a-f]{32})\.[a-z0-9]+$")
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    업로드 이미지 전용 StaticFiles
+    - 강한 ETag (내용 주소 파일은 해시 자체, 그 외는 mtime+크기)
+    - Cache-Control: immutable (이름이 바뀌지 않는 한 내용도 그대로)
+    - If-None-Match → 304, Range/If-Range → 206 (Starlette FileResponse가 처리)
+    - 서버가 http.response.pathsend 확장을 지원하면 FileResponse가 zero-copy로 전송
+    - 업로드 중인 임시 파일(.xxx.part) 같은 숨김 파일은 노출하지 않음
+    """
+
+    def lookup_path(self, path: str):
+        if any(part.startswith(".") for part in path.replace("\\", "/").split("/") if part):
+            return "", None
+        return super().lookup_path(path)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        name = os.path.basename(full_path)
+        match = _IMMUTABLE_NAME_RE.match(name)
+        if match:
+            response.headers["etag"] = f'"{match.group(1)}"'
+            response.headers["cache-control"] = f"public, max-age={UPLOADS_MAX_AGE}, immutable"
+        else:
+            response.headers["etag"] = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+            response.headers["cache-control"] = f"public, max-age={UPLOADS_FALLBACK_MAX_AGE}"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,282 @@
+"""
+⏱ API 벤치마크 (배포 전 성능 회귀 확인용)
+
+가짜 데이터가 들어 있는 DB를 대상으로 FastAPI 앱을 httpx ASGI transport로 직접 호출해서
+엔드포인트별 p50/p95/p99 응답 시간, 처리량, 요청당 쿼리 수(Server-Timing 헤더)를 측정하고
+저장해 둔 기준값(baseline)과 비교 (backend 폴더에서 실행, SQLite 대체 DB는 aiosqlite 사용)
+
+    python -m tools.bench                                  # bench.db(SQLite)가 없으면 만들고 측정
+    python -m tools.bench --reseed --posts 20000           # 데이터 다시 만들기
+    python -m tools.bench --save-baseline                  # 현재 결과를 기준값으로 저장
+    python -m tools.bench --fail-on-regression             # 기준값보다 느려졌으면 종료 코드 1
+    python -m tools.bench --db-url env                     # .env의 MySQL 사용 (seed_data로 미리 채워 둘 것)
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from datetime import timedelta
+
+from tools.seed_data import BENCH_PASSWORD, BENCH_USER_PREFIX, add_arguments, seed_from_args, use_database, create_schema
+
+DEFAULT_DB_URL = "sqlite:///./bench.db"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+
+_QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+# 📋 측정할 요청 (이름, 메서드, 경로 생성 함수, 본문 생성 함수, 인증 필요 여부, 최대 요청 수)
+def _scenarios(login_requests: int) -> list:
+    return [
+        ("GET /posts/", "GET", lambda ctx, rng: f"/posts/?page={rng.randint(1, ctx['post_pages'])}&page_size=8", None, False, None),
+        ("GET /posts/?order=active", "GET", lambda ctx, rng: "/posts/?order=active&pagination=cursor&page_size=8", None, False, None),
+        ("GET /posts/{post_id}", "GET", lambda ctx, rng: f"/posts/{_random_post(ctx, rng)}", None, False, None),
+        ("GET /comments/{post_id}", "GET", lambda ctx, rng: f"/comments/{_random_post(ctx, rng)}", None, False, None),
+        ("GET /comments/{post_id}/threads", "GET", lambda ctx, rng: f"/comments/{_random_post(ctx, rng)}/threads", None, False, None),
+        ("GET /notifications/", "GET", lambda ctx, rng: "/notifications/?limit=50", None, True, None),
+        ("GET /notifications/?unread_only", "GET", lambda ctx, rng: "/notifications/?limit=50&unread_only=true", None, True, None),
+        ("GET /notifications/unread-count", "GET", lambda ctx, rng: "/notifications/unread-count", None, True, None),
+        # bcrypt 검증은 요청당 수백 ms이므로 횟수를 따로 제한
+        ("POST /auth/login", "POST", lambda ctx, rng: "/auth/login",
+         lambda ctx, rng: {"user_id": rng.choice(ctx["user_ids"]), "password": BENCH_PASSWORD}, False, login_requests),
+    ]
+
+
+def _random_post(ctx: dict, rng: random.Random) -> int:
+    return rng.randint(*ctx["posts"])
+
+
+def _load_context() -> dict:
+    """
+    측정에 쓸 id 범위 / 사용자 / 토큰 준비 (bench<번호> 사용자만 사용)
+    """
+    from sqlalchemy import text
+    from database import engine
+    from routes.auth import create_access_token
+
+    with engine.connect() as conn:
+        users = conn.execute(
+            text("SELECT id, user_id, nickname FROM users WHERE user_id LIKE :prefix ORDER BY id LIMIT 200"),
+            {"prefix": f"{BENCH_USER_PREFIX}%"},
+        ).mappings().all()
+        post_min, post_max, post_count = conn.execute(text("SELECT MIN(id), MAX(id), COUNT(*) FROM posts")).one()
+    if not users or not post_count:
+        raise SystemExit("❌ 벤치마크용 데이터가 없습니다. --reseed 또는 python -m tools.seed_data로 먼저 만들어 주세요.")
+
+    tokens = [
+        create_access_token(
+            {"id": u["id"], "sub": u["user_id"], "nickname": u["nickname"], "is_admin": 0, "is_banned": 0},
+            expires_delta=timedelta(hours=1),
+        )
+        for u in users
+    ]
+    return {
+        "posts": (post_min, post_max),
+        "post_pages": max(1, min(post_count // 8, 50)),  # 앞쪽 50페이지 안에서 골고루
+        "user_ids": [u["user_id"] for u in users],
+        "tokens": tokens,
+    }
+
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)  # nearest-rank
+    return ordered[index]
+
+
+async def _run_scenario(client, ctx: dict, scenario: tuple, requests: int, concurrency: int, warmup: int, rng) -> dict:
+    name, method, path_fn, body_fn, needs_auth, limit = scenario
+    total = min(requests, limit) if limit else requests
+    latencies, queries = [], []
+    errors = 0
+    cache_hits = 0
+
+    async def call():
+        headers = {}
+        if needs_auth:
+            headers["Authorization"] = f"Bearer {rng.choice(ctx['tokens'])}"
+        body = body_fn(ctx, rng) if body_fn else None
+        started = time.perf_counter()
+        response = await client.request(method, path_fn(ctx, rng), json=body, headers=headers)
+        return time.perf_counter() - started, response
+
+    for _ in range(min(warmup, total)):
+        await call()
+
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors, cache_hits
+        for _ in remaining:
+            elapsed, response = await call()
+            if response.status_code >= 400:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            match = _QUERY_COUNT.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+            if response.headers.get("x-cache") == "HIT":
+                cache_hits += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "rps": round(total / wall, 1) if wall else 0.0,
+        "queries": round(sum(queries) / len(queries), 2) if queries else None,
+        "cache_hit_ratio": round(cache_hits / len(latencies), 2) if latencies else None,
+    }
+
+
+async def run(requests: int, concurrency: int, warmup: int, login_requests: int, seed_value: int, only: list) -> dict:
+    import httpx
+    from main import app
+
+    ctx = _load_context()
+    rng = random.Random(seed_value)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in _scenarios(login_requests):
+                if only and not any(keyword in scenario[0] for keyword in only):
+                    continue
+                results[scenario[0]] = await _run_scenario(client, ctx, scenario, requests, concurrency, warmup, rng)
+                _print_row(scenario[0], results[scenario[0]])
+    finally:
+        await close_app()
+    return results
+
+
+async def close_app():
+    """
+    ASGITransport는 lifespan을 실행하지 않으므로 종료 처리를 직접 함
+    (aiosqlite 작업 스레드가 남아 있으면 인터프리터가 종료되지 않음)
+    """
+    from database import async_engine, engine
+    from image_variants import shutdown_executor as shutdown_image_executor
+    from password_hasher import shutdown_executor as shutdown_password_executor
+
+    await async_engine.dispose()
+    engine.dispose()
+    shutdown_image_executor()
+    shutdown_password_executor()
+
+
+def prepare_database(args):
+    """
+    --db-url 대상 DB를 준비 (SQLite 파일이 없거나 --reseed면 스키마 생성 + 데이터 생성)
+    database 모듈을 import하기 전에 호출해야 함
+    """
+    sqlite_path = None
+    if args.db_url != "env":
+        use_database(args.db_url)
+        if args.db_url.startswith("sqlite:///"):
+            sqlite_path = args.db_url[len("sqlite:///"):]
+
+    if sqlite_path and (args.reseed or not os.path.exists(sqlite_path)):
+        if os.path.exists(sqlite_path):
+            os.remove(sqlite_path)
+        create_schema()
+        started = time.perf_counter()
+        summary = seed_from_args(args)
+        print(f"🌱 데이터 생성 완료 ({time.perf_counter() - started:.1f}s): {summary}")
+    elif args.reseed:
+        seed_from_args(args)
+
+
+# 📊 결과 출력 / 기준값 비교
+def _print_header():
+    print(f"{'endpoint':<36} {'req':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'queries':>8} {'hit':>5}")
+
+
+def _print_row(name: str, r: dict):
+    queries = "-" if r["queries"] is None else r["queries"]
+    hit = "-" if r["cache_hit_ratio"] is None else r["cache_hit_ratio"]
+    print(
+        f"{name:<36} {r['requests']:>5} {r['errors']:>4} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+        f"{r['p99_ms']:>8} {r['rps']:>8} {queries:>8} {hit:>5}"
+    )
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    기준값보다 p95가 tolerance 비율 이상 느려졌거나 요청당 쿼리 수가 늘어난 엔드포인트 목록
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms → {current['p95_ms']}ms")
+        if base.get("queries") is not None and current["queries"] is not None and current["queries"] > base["queries"] + 0.5:
+            regressions.append(f"{name}: 요청당 쿼리 {base['queries']} → {current['queries']}")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: 오류 {base.get('errors', 0)} → {current['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 벤치마크 (p50/p95/p99, 처리량, 쿼리 수)")
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL, help="대상 DB (env: .env 설정 사용)")
+    parser.add_argument("--reseed", action="store_true", help="SQLite 파일을 지우고 데이터를 다시 생성")
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시에 보내는 요청 수")
+    parser.add_argument("--warmup", type=int, default=10, help="측정 전에 버리는 요청 수")
+    parser.add_argument("--login-requests", type=int, default=20, help="로그인 요청 수 (bcrypt가 느려서 따로 제한)")
+    parser.add_argument("--only", nargs="*", default=[], help="이름에 이 문자열이 들어간 엔드포인트만 측정")
+    parser.add_argument("--no-cache", action="store_true", help="응답 캐시를 끄고 측정 (DB 경로만 확인)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준값 파일")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 허용 증가 비율")
+    parser.add_argument("--fail-on-regression", action="store_true", help="기준값보다 나빠졌으면 종료 코드 1")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    # 엔진/캐시 설정은 import 시점에 읽히므로 앱을 import하기 전에 환경 변수부터 설정
+    os.environ["SQL_SERVER_TIMING"] = "1"
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "0"
+    prepare_database(args)
+
+    _print_header()
+    results = asyncio.run(run(args.requests, args.concurrency, args.warmup, args.login_requests, args.seed, args.only))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준값 저장: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ 기준값 파일이 없습니다. --save-baseline으로 먼저 저장해 주세요.")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    if regressions:
+        print("⚠️ 기준값보다 나빠진 항목:")
+        for line in regressions:
+            print(f"  - {line}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("✅ 기준값 대비 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+🔍 자주 쓰는 조회 쿼리의 실행 계획(EXPLAIN) 확인
+
+각 API가 실제로 보내는 쿼리와 같은 모양의 쿼리를 EXPLAIN 해서 기대한 인덱스를 쓰는지 확인
+(인덱스/쿼리를 바꾼 뒤 회귀 확인용, 기대와 다르면 종료 코드 1, backend 폴더에서 실행)
+행 수가 너무 적으면 옵티마이저가 전체 스캔을 고를 수 있으므로 실제와 비슷한 데이터가 있는 DB에서 실행
+
+    python -m tools.explain_check              # 확인 결과 요약
+    python -m tools.explain_check --verbose    # EXPLAIN 결과 행 전체 출력
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from sqlalchemy import text
+
+from database import engine
+
+# (이름, 쿼리, 확인할 테이블 별칭, 기대 인덱스)
+CHECKS = [
+    (
+        "게시글 목록 최신순",
+        "SELECT p.*, u.nickname FROM posts p LEFT JOIN users u ON u.id = p.owner_id "
+        "ORDER BY p.created_at DESC, p.id DESC LIMIT 20",
+        "p", "ix_posts_created",
+    ),
+    (
+        "게시글 목록 최신순 다음 페이지",
+        "SELECT p.*, u.nickname FROM posts p LEFT JOIN users u ON u.id = p.owner_id "
+        "WHERE (p.created_at < :now OR (p.created_at = :now AND p.id < :post_id)) "
+        "ORDER BY p.created_at DESC, p.id DESC LIMIT 20",
+        "p", "ix_posts_created",
+    ),
+    (
+        "게시글 목록 제목순",
+        "SELECT p.*, u.nickname FROM posts p LEFT JOIN users u ON u.id = p.owner_id "
+        "ORDER BY p.title ASC, p.id ASC LIMIT 20",
+        "p", "ix_posts_title",
+    ),
+    (
+        "게시글 목록 최근 활동순",
+        "SELECT p.*, u.nickname FROM posts p LEFT JOIN users u ON u.id = p.owner_id "
+        "ORDER BY p.last_activity_at DESC, p.id DESC LIMIT 20",
+        "p", "ix_posts_last_activity",
+    ),
+    (
+        "게시글 작성자 조인",
+        "SELECT p.*, u.nickname FROM posts p LEFT JOIN users u ON u.id = p.owner_id WHERE p.id = :post_id",
+        "u", "PRIMARY",
+    ),
+    (
+        "내가 쓴 글",
+        "SELECT id, title, created_at FROM posts WHERE owner_id = :user_pk ORDER BY created_at DESC LIMIT 8",
+        "posts", "ix_posts_owner_created",
+    ),
+    (
+        "내가 쓴 댓글",
+        "SELECT id, content, created_at FROM comments WHERE user_id = :user_pk ORDER BY created_at DESC LIMIT 8",
+        "comments", "ix_comments_user_created",
+    ),
+    (
+        "댓글 스레드 최상위 댓글",
+        "SELECT * FROM comments WHERE post_id = :post_id AND parent_id IS NULL "
+        "ORDER BY created_at, id LIMIT 20",
+        "comments", "ix_comments_post_parent_created",
+    ),
+    (
+        "대댓글 더 보기",
+        "SELECT * FROM comments WHERE post_id = :post_id AND parent_id = :comment_id "
+        "ORDER BY created_at, id LIMIT 20",
+        "comments", "ix_comments_post_parent_created",
+    ),
+    (
+        "알림 목록",
+        "SELECT * FROM notifications WHERE user_id = :user_pk "
+        "ORDER BY created_at DESC, id DESC LIMIT 50",
+        "notifications", "ix_notifications_user_created",
+    ),
+    (
+        "안 읽은 알림 목록",
+        "SELECT * FROM notifications WHERE user_id = :user_pk AND is_read = 0 "
+        "ORDER BY created_at DESC, id DESC LIMIT 50",
+        "notifications", "ix_notifications_user_read_created",
+    ),
+    (
+        "오래된 읽은 알림 정리",
+        "SELECT id FROM notifications WHERE is_read = 1 AND created_at < :now ORDER BY id LIMIT 1000",
+        "notifications", "ix_notifications_read_created",
+    ),
+]
+
+
+def _sample_params(conn) -> dict:
+    # 실제 존재하는 값으로 EXPLAIN 해야 옵티마이저 추정이 실제 요청과 비슷해짐
+    row = conn.execute(text(
+        "SELECT (SELECT MAX(id) FROM posts) AS post_id, "
+        "(SELECT MAX(id) FROM users) AS user_pk, "
+        "(SELECT MAX(id) FROM comments WHERE parent_id IS NULL) AS comment_id"
+    )).mappings().first()
+    return {
+        "post_id": row["post_id"] or 1,
+        "user_pk": row["user_pk"] or 1,
+        "comment_id": row["comment_id"] or 1,
+        "now": datetime.now(),
+    }
+
+
+def run_checks(verbose: bool = False) -> int:
+    """
+    기대한 인덱스를 쓰지 않는 쿼리 수를 반환
+    """
+    failures = 0
+    with engine.connect() as conn:
+        params = _sample_params(conn)
+        for name, query, table, expected in CHECKS:
+            plan = conn.execute(text(f"EXPLAIN {query}"), params).mappings().all()
+            row = next((r for r in plan if r["table"] == table), None)
+            used = row["key"] if row else None
+            ok = used == expected
+            failures += not ok
+            mark = "✅" if ok else "❌"
+            print(f"{mark} {name}: {table} → {used or '인덱스 없음'}" + ("" if ok else f" (기대: {expected})"))
+            if verbose or not ok:
+                for r in plan:
+                    print(f"     {dict(r)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="자주 쓰는 조회 쿼리의 인덱스 사용 여부 확인")
+    parser.add_argument("--verbose", action="store_true", help="EXPLAIN 결과 행 전체 출력")
+    args = parser.parse_args()
+
+    failures = run_checks(args.verbose)
+    if failures:
+        print(f"⚠️ 기대한 인덱스를 쓰지 않는 쿼리 {failures}개")
+        sys.exit(1)
+    print("✅ 모든 쿼리가 기대한 인덱스를 사용합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+🔁 N+1 쿼리 / 쿼리 예산 검사
+
+벤치마크용 DB(tools.bench와 같은 데이터)를 대상으로 주요 API를 호출하면서 요청마다 실행한 SQL을 모아
+- 라우트가 선언한 쿼리 예산(query_budget)을 넘은 요청
+- 한 요청 안에서 같은 SQL 문장이 N_PLUS_ONE_THRESHOLD번 이상 반복된 경우(N+1 의심)
+- 4xx/5xx 응답 (새 이미지/중복 이미지 업로드 포함)
+이 하나라도 있으면 종료 코드 1 (배포 전 / 쿼리 관련 변경 후 실행, backend 폴더에서 실행)
+
+캐시(응답/댓글 트리/인증/게시글 수)를 끄고 실행하므로 항상 DB까지 가는 경로를 검사함
+get_connection()으로 빌린 DBAPI 연결도 계측되는지 같이 확인
+업로드 파일은 임시 폴더(UPLOAD_DIR)에 저장하고 끝나면 지움
+
+    python -m tools.query_budget
+    python -m tools.query_budget --requests 20 --reseed
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+
+from tools.bench import DEFAULT_DB_URL, close_app, prepare_database, _load_context, _scenarios
+from tools.seed_data import add_arguments
+
+_QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+async def _call(client, observed: dict, name: str, method: str, path: str, **kwargs):
+    response = await client.request(method, path, **kwargs)
+    entry = observed.setdefault(name, {"max_queries": 0, "errors": 0})
+    match = _QUERY_COUNT.search(response.headers.get("server-timing", ""))
+    if match:
+        entry["max_queries"] = max(entry["max_queries"], int(match.group(1)))
+    if response.status_code >= 400:
+        entry["errors"] += 1
+        print(f"  ❌ {name}: {response.status_code} {response.text[:200]}")
+    return response
+
+
+async def run(requests: int, seed_value: int) -> tuple:
+    import httpx
+    from sqlalchemy import text
+    from database import engine
+    from main import app
+    from query_stats import query_issues
+
+    ctx = _load_context()
+    rng = random.Random(seed_value)
+    with engine.connect() as conn:
+        root = conn.execute(text("SELECT id, post_id FROM comments WHERE parent_id IS NULL ORDER BY id LIMIT 1")).first()
+
+    observed = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://query-budget") as client:
+            # 조회 경로 (벤치마크와 같은 요청)
+            for name, method, path_fn, body_fn, needs_auth, limit in _scenarios(login_requests=min(requests, 3)):
+                for _ in range(min(requests, limit) if limit else requests):
+                    headers = {"Authorization": f"Bearer {rng.choice(ctx['tokens'])}"} if needs_auth else {}
+                    body = body_fn(ctx, rng) if body_fn else None
+                    await _call(client, observed, name, method, path_fn(ctx, rng), json=body, headers=headers)
+
+            # 검색 (MySQL은 FULLTEXT, 그 밖의 DB는 LIKE)
+            for keyword in ("게시", "a"):
+                await _call(client, observed, "GET /posts/?keyword", "GET", "/posts/", params={"keyword": keyword})
+
+            # 쓰기 / 내 정보 경로
+            headers = {"Authorization": f"Bearer {ctx['tokens'][0]}"}
+            for _ in range(requests):
+                post_id = rng.randint(*ctx["posts"])
+                await _call(client, observed, "POST /comments/", "POST", "/comments/",
+                            data={"content": "예산 검사 댓글", "post_id": str(post_id)}, headers=headers)
+                if root is not None:
+                    await _call(client, observed, "POST /comments/ (reply)", "POST", "/comments/",
+                                data={"content": "예산 검사 대댓글", "post_id": str(root.post_id), "parent_id": str(root.id)},
+                                headers=headers)
+                    await _call(client, observed, "GET /comments/replies/{parent_id}", "GET", f"/comments/replies/{root.id}")
+                await _call(client, observed, "GET /user/my-posts", "GET", "/user/my-posts", headers=headers)
+                await _call(client, observed, "GET /user/my-comments", "GET", "/user/my-comments", headers=headers)
+
+            # 이미지 업로드 경로 (새 이미지 / 같은 이미지 재업로드)
+            await _check_uploads(client, observed, headers, rng.randint(*ctx["posts"]))
+    finally:
+        await close_app()
+    return observed, list(query_issues)
+
+
+def _random_png() -> bytes:
+    # 실행할 때마다 해시가 다른 이미지 (처음 올라온 이미지 경로를 검사하기 위함)
+    from io import BytesIO
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.frombytes("RGB", (64, 64), os.urandom(64 * 64 * 3)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _check_uploads(client, observed: dict, headers: dict, post_id: int):
+    image = _random_png()
+    for name in ("POST /upload/ (new)", "POST /upload/ (duplicate)"):
+        await _call(client, observed, name, "POST", "/upload/", files={"file": ("bench.png", image, "image/png")})
+    await _call(client, observed, "POST /posts/ (image)", "POST", "/posts/",
+                data={"title": "예산 검사 게시글", "content": "이미지 포함"},
+                files={"file": ("bench.png", _random_png(), "image/png")}, headers=headers)
+    await _call(client, observed, "POST /comments/ (image)", "POST", "/comments/",
+                data={"content": "예산 검사 이미지 댓글", "post_id": str(post_id)},
+                files={"file": ("bench.png", _random_png(), "image/png")}, headers=headers)
+
+
+def check_raw_connection() -> bool:
+    """
+    get_connection() 경로의 커서 실행도 요청별 쿼리 수에 잡히는지 확인
+    """
+    from database import get_connection
+    from query_stats import track_queries
+
+    conn = get_connection()
+    if conn is None:
+        print("❌ get_connection(): 연결을 가져오지 못했습니다.")
+        return False
+    try:
+        with track_queries() as stats:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+    finally:
+        conn.close()
+    ok = stats.count == 1
+    print(f"{'✅' if ok else '❌'} get_connection() 커서 계측: 쿼리 {stats.count}개 기록")
+    return ok
+
+
+def _summarize_issues(issues: list) -> list:
+    # 같은 라우트 / 같은 문제는 한 번만 (가장 많이 실행된 횟수로)
+    unique = {}
+    for issue in issues:
+        key = (issue["route"], issue["kind"], issue.get("statement"))
+        if key not in unique or issue["count"] > unique[key]["count"]:
+            unique[key] = issue
+    return list(unique.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N+1 쿼리 / 쿼리 예산 검사")
+    parser.add_argument("--db-url", default=DEFAULT_DB_URL, help="대상 DB (env: .env 설정 사용)")
+    parser.add_argument("--reseed", action="store_true", help="SQLite 파일을 지우고 데이터를 다시 생성")
+    parser.add_argument("--requests", type=int, default=5, help="경로별 요청 수")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    # 캐시를 끄고 문장 추적을 켠 상태로 앱을 import (설정은 import 시점에 읽힘)
+    os.environ.update({
+        "QUERY_TRACKING": "1",
+        "SQL_SERVER_TIMING": "1",
+        "RESPONSE_CACHE_ENABLED": "0",
+        "COMMENT_TREE_CACHE_TTL": "0",
+        "AUTH_CACHE_TTL": "0",
+        "POST_COUNT_CACHE_TTL": "0",
+    })
+    upload_dir = os.environ["UPLOAD_DIR"] = tempfile.mkdtemp(prefix="query_budget_uploads_")
+    prepare_database(args)
+
+    try:
+        observed, issues = asyncio.run(run(args.requests, args.seed))
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+    for name, entry in observed.items():
+        print(f"  {name:<40} 최대 쿼리 {entry['max_queries']:>3}  오류 {entry['errors']}")
+
+    issues = _summarize_issues(issues)
+    for issue in issues:
+        if issue["kind"] == "budget":
+            print(f"📏 {issue['route']}: 쿼리 {issue['count']}개 (예산 {issue['budget']}개)")
+        else:
+            print(f"🔁 {issue['route']}: 같은 쿼리 {issue['count']}번 반복 (N+1 의심)\n     {issue['statement']}")
+
+    raw_ok = check_raw_connection()
+    errors = sum(entry["errors"] for entry in observed.values())
+    if issues or errors or not raw_ok:
+        print(f"⚠️ 문제 {len(issues)}개, 오류 응답 {errors}개")
+        sys.exit(1)
+    print("✅ 모든 경로가 쿼리 예산 안에 있고 N+1 패턴이 없습니다.")
+
+
+if __name__ == "__main__":
+    main()
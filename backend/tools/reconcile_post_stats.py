@@ -0,0 +1,82 @@
+"""
+💬 게시글 댓글 수 / 마지막 댓글 시간 보정
+
+posts.comment_count, posts.last_commented_at을 comments 테이블 기준으로 다시 계산
+(post_stats의 증분 갱신이 어긋났을 때 사용, backend 폴더에서 실행)
+
+    python -m tools.reconcile_post_stats            # 어긋난 게시글 수만 확인
+    python -m tools.reconcile_post_stats --apply    # 실제로 보정
+    python -m tools.reconcile_post_stats --post-id 42 --apply
+"""
+import argparse
+
+from sqlalchemy import text
+
+from database import engine
+
+# 게시글별 실제 댓글 수/마지막 댓글 시간
+_ACTUAL = """
+    SELECT p.id,
+        p.comment_count,
+        p.last_commented_at,
+        COUNT(c.id) AS actual_count,
+        MAX(c.created_at) AS actual_last
+    FROM posts p
+    LEFT JOIN comments c ON c.post_id = p.id
+    {where}
+    GROUP BY p.id, p.comment_count, p.last_commented_at
+"""
+
+_DRIFT = """
+    SELECT * FROM ({actual}) s
+    WHERE s.comment_count <> s.actual_count
+        OR NOT (s.last_commented_at <=> s.actual_last)
+"""
+
+_FIX = """
+    UPDATE posts p
+    JOIN ({drift}) d ON d.id = p.id
+    SET p.comment_count = d.actual_count,
+        p.last_commented_at = d.actual_last
+"""
+
+
+def reconcile(post_id: int = None, apply: bool = False) -> int:
+    """
+    어긋난 게시글 수를 반환 (apply=True면 보정까지)
+    """
+    where = "WHERE p.id = :post_id" if post_id is not None else ""
+    drift = _DRIFT.format(actual=_ACTUAL.format(where=where))
+    params = {"post_id": post_id} if post_id is not None else {}
+
+    with engine.begin() as conn:
+        rows = conn.execute(text(drift), params).mappings().all()
+        for row in rows[:20]:
+            print(
+                f"  post {row['id']}: comment_count {row['comment_count']} → {row['actual_count']}, "
+                f"last_commented_at {row['last_commented_at']} → {row['actual_last']}"
+            )
+        if len(rows) > 20:
+            print(f"  ... 외 {len(rows) - 20}개")
+        if apply and rows:
+            conn.execute(text(_FIX.format(drift=drift)), params)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="게시글 댓글 수/마지막 댓글 시간 보정")
+    parser.add_argument("--post-id", type=int, default=None, help="특정 게시글만 확인")
+    parser.add_argument("--apply", action="store_true", help="어긋난 값을 실제로 보정")
+    args = parser.parse_args()
+
+    count = reconcile(args.post_id, args.apply)
+    if not count:
+        print("✅ 어긋난 게시글이 없습니다.")
+    elif args.apply:
+        print(f"🔧 게시글 {count}개를 보정했습니다.")
+    else:
+        print(f"⚠️ 어긋난 게시글 {count}개 (--apply로 보정)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+🌱 벤치마크/부하 테스트용 가짜 데이터 생성
+
+사용자 / 게시글 / 대댓글이 달린 댓글 / 알림을 원하는 양만큼 한꺼번에 INSERT (backend 폴더에서 실행)
+같은 --seed 값이면 항상 같은 데이터가 만들어짐. 기존 행 뒤에 이어서 추가하므로 로컬 MySQL에도 사용 가능
+(운영 DB에는 실행하지 말 것)
+
+    python -m tools.seed_data --db-url sqlite:///./bench.db --create-schema
+    python -m tools.seed_data --users 1000 --posts 20000 --comments-per-post 15
+
+만들어지는 사용자 아이디는 bench<번호>, 비밀번호는 BENCH_PASSWORD
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+BENCH_PASSWORD = "benchpass1"
+BENCH_USER_PREFIX = "bench"
+
+_WORDS = (
+    "오늘", "점심", "추천", "질문", "후기", "공유", "정리", "개발", "여행", "사진",
+    "맛집", "날씨", "운동", "영화", "음악", "게임", "책", "코드", "버그", "배포",
+)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _next_id(conn, table) -> int:
+    from sqlalchemy import func, select
+    return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _insert(conn, table, rows: list, batch: int):
+    from sqlalchemy import insert
+    for start in range(0, len(rows), batch):
+        conn.execute(insert(table), rows[start:start + batch])
+
+
+def seed(
+    users: int = 200,
+    posts: int = 2000,
+    comments_per_post: int = 10,
+    reply_ratio: float = 0.5,
+    notifications_per_user: int = 50,
+    read_ratio: float = 0.7,
+    seed_value: int = 42,
+    batch: int = 1000,
+) -> dict:
+    """
+    데이터를 만들고 생성된 id 범위를 반환
+    댓글 수 / 마지막 댓글 시간 / 안 읽은 알림 수 같은 집계 컬럼도 같이 채움
+    """
+    from database import engine
+    from models import User, Post, Comment, Notification
+    from password_hasher import hash_password
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow().replace(microsecond=0)
+    hashed = hash_password(BENCH_PASSWORD)  # bcrypt는 느리므로 한 번만 계산해서 같이 사용
+
+    with engine.begin() as conn:
+        user_start = _next_id(conn, User.__table__)
+        post_start = _next_id(conn, Post.__table__)
+        comment_start = _next_id(conn, Comment.__table__)
+        notification_start = _next_id(conn, Notification.__table__)
+
+        user_rows = [
+            {
+                "id": user_start + i,
+                "user_id": f"{BENCH_USER_PREFIX}{user_start + i}"[:16],
+                "hashed_password": hashed,
+                "nickname": f"벤치{user_start + i}"[:16],
+                "is_admin": 0,
+                "is_active": 1,
+                "is_banned": 0,
+                "is_deleted": False,
+                "unread_notification_count": 0,
+            }
+            for i in range(users)
+        ]
+
+        post_rows = []
+        for i in range(posts):
+            owner = rng.choice(user_rows)
+            created_at = now - timedelta(minutes=rng.randint(60, 90 * 24 * 60))
+            post_rows.append({
+                "id": post_start + i,
+                "title": _sentence(rng, rng.randint(2, 6)),
+                "content": _sentence(rng, rng.randint(20, 120)),
+                "image_url": None,
+                "created_at": created_at,
+                "owner_id": owner["id"],
+                "user_id": owner["user_id"],
+                "nickname": owner["nickname"],
+                "comment_count": 0,
+                "last_commented_at": None,
+                "last_activity_at": created_at,
+            })
+
+        comment_rows = []
+        comment_id = comment_start
+        for post in post_rows:
+            roots = []
+            created_at = post["created_at"]
+            for _ in range(rng.randint(0, comments_per_post * 2)):
+                author = rng.choice(user_rows)
+                created_at += timedelta(seconds=rng.randint(1, 3600))
+                parent_id = rng.choice(roots) if roots and rng.random() < reply_ratio else None
+                comment_rows.append({
+                    "id": comment_id,
+                    "post_id": post["id"],
+                    "content": _sentence(rng, rng.randint(3, 30)),
+                    "image_url": None,
+                    "parent_id": parent_id,
+                    "created_at": created_at,
+                    "user_id": author["id"],
+                    "nickname": author["nickname"],
+                })
+                if parent_id is None:
+                    roots.append(comment_id)
+                comment_id += 1
+                post["comment_count"] += 1
+                post["last_commented_at"] = created_at
+                post["last_activity_at"] = max(post["last_activity_at"], created_at)
+
+        notification_rows = []
+        for i, user in enumerate(user_rows):
+            for _ in range(notifications_per_user):
+                post = rng.choice(post_rows) if post_rows else None
+                is_read = rng.random() < read_ratio
+                notification_rows.append({
+                    "id": notification_start + len(notification_rows),
+                    "user_id": user["id"],
+                    "type": rng.choice(("comment_on_post", "reply_on_comment")),
+                    "message": "벤치마크 알림",
+                    "post_id": post["id"] if post else None,
+                    "comment_id": None,
+                    "is_read": 1 if is_read else 0,
+                    "created_at": now - timedelta(minutes=rng.randint(1, 30 * 24 * 60)),
+                })
+                if not is_read:
+                    user["unread_notification_count"] += 1
+
+        _insert(conn, User.__table__, user_rows, batch)
+        _insert(conn, Post.__table__, post_rows, batch)
+        _insert(conn, Comment.__table__, comment_rows, batch)
+        _insert(conn, Notification.__table__, notification_rows, batch)
+
+    return {
+        "users": (user_start, user_start + len(user_rows) - 1),
+        "posts": (post_start, post_start + len(post_rows) - 1),
+        "comments": len(comment_rows),
+        "notifications": len(notification_rows),
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments-per-post", type=int, default=10, help="게시글당 평균 댓글 수")
+    parser.add_argument("--reply-ratio", type=float, default=0.5, help="댓글 중 대댓글 비율")
+    parser.add_argument("--notifications-per-user", type=int, default=50)
+    parser.add_argument("--read-ratio", type=float, default=0.7, help="알림 중 읽은 알림 비율")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같으면 같은 데이터)")
+    parser.add_argument("--batch", type=int, default=1000, help="INSERT 한 번에 넣는 행 수")
+
+
+def seed_from_args(args) -> dict:
+    return seed(
+        users=args.users,
+        posts=args.posts,
+        comments_per_post=args.comments_per_post,
+        reply_ratio=args.reply_ratio,
+        notifications_per_user=args.notifications_per_user,
+        read_ratio=args.read_ratio,
+        seed_value=args.seed,
+        batch=args.batch,
+    )
+
+
+def use_database(db_url: str):
+    """
+    database 모듈을 import하기 전에 호출해야 함 (엔진이 import 시점에 만들어짐)
+    sqlite:///파일 을 넘기면 비동기 엔진은 같은 파일을 aiosqlite로 사용
+    """
+    os.environ["DB_URL"] = db_url
+    if db_url.startswith("sqlite:"):
+        os.environ["ASYNC_DB_URL"] = db_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+
+
+def create_schema():
+    # SQLite 대체 DB용 (MySQL은 alembic upgrade head 사용)
+    from database import engine
+    from models import Base
+    Base.metadata.create_all(bind=engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 데이터 생성")
+    parser.add_argument("--db-url", default=None, help="대상 DB (기본: .env 설정), 예: sqlite:///./bench.db")
+    parser.add_argument("--create-schema", action="store_true", help="테이블이 없으면 models 기준으로 생성 (SQLite용)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.db_url:
+        use_database(args.db_url)
+    if args.create_schema:
+        create_schema()
+
+    summary = seed_from_args(args)
+    print(
+        f"🌱 사용자 {summary['users'][1] - summary['users'][0] + 1}명, "
+        f"게시글 {summary['posts'][1] - summary['posts'][0] + 1}개, "
+        f"댓글 {summary['comments']}개, 알림 {summary['notifications']}개 생성"
+    )
+
+
+if __name__ == "__main__":
+    main()
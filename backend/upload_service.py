@@ -0,0 +1,352 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import uuid4
+
+import anyio
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import select, update, delete, case, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import AsyncSessionLocal
+from models import ImageBlob
+from image_variants import VARIANTS, create_variants, has_variants, variant_path
+from metrics import inc as inc_metric
+
+# 📌 이미지 저장 경로 및 업로드 제한
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")                                   # 업로드 파일 저장 폴더
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))         # 한 번에 읽는 크기
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))    # 최대 업로드 크기
+
+# 🧹 참조가 0이 된 이미지 정리 (백그라운드 스위퍼)
+BLOB_SWEEP_INTERVAL = float(os.getenv("BLOB_SWEEP_INTERVAL", "600"))            # 실행 주기(초)
+BLOB_SWEEP_GRACE_SECONDS = int(os.getenv("BLOB_SWEEP_GRACE_SECONDS", "3600"))   # 참조 0 이후 유예 시간(초)
+BLOB_SWEEP_BATCH = int(os.getenv("BLOB_SWEEP_BATCH", "200"))
+
+
+def ensure_upload_dir():
+    # 서버 시작 시(lifespan) 한 번 호출
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+
+# 🔎 파일 시그니처(매직 바이트) → (확장자, MIME 타입)
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png", "image/png"),
+    (b"GIF87a", "gif", "image/gif"),
+    (b"GIF89a", "gif", "image/gif"),
+]
+_SIGNATURE_BYTES = 12  # WebP 판별에 필요한 길이 (RIFF????WEBP)
+
+# 내용 주소 방식 경로: /uploads/ab/cd/<sha256>.<ext>
+_BLOB_URL_RE = re.compile(r"/uploads/([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})\.([a-z0-9]+)$")
+
+
+def detect_image_type(head: bytes) -> Optional[tuple]:
+    """
+    파일 앞부분으로 이미지 형식을 판별 (파일명 확장자는 신뢰하지 않음)
+    """
+    for signature, ext, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return ext, content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp", "image/webp"
+    return None
+
+
+def blob_path(sha256: str, ext: str) -> str:
+    """
+    해시 앞 4자리로 2단계 디렉터리를 나눈 상대 경로 (한 폴더에 파일이 몰리지 않도록)
+    """
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{ext}"
+
+
+@dataclass
+class StoredUpload:
+    filename: str       # uploads/ 아래 상대 경로
+    url: str            # 클라이언트에 돌려줄 경로 (/uploads/...)
+    sha256: str         # 내용 해시
+    size: int           # 바이트 수
+    content_type: str
+
+
+# ✅ 업로드 저장 (청크 단위 스트리밍 + 중복 제거)
+async def save_upload(db: AsyncSession, file: UploadFile) -> StoredUpload:
+    """
+    업로드 파일을 UPLOAD_CHUNK_SIZE 단위로 읽어 내용 해시 이름으로 저장하고 참조 수를 1 올림
+    - 전체 파일을 메모리에 올리지 않음
+    - 파일 쓰기는 워커 스레드에서 실행 (이벤트 루프를 막지 않음)
+    - 읽는 도중 UPLOAD_MAX_BYTES를 넘으면 즉시 중단 (413)
+    - 매직 바이트로 형식 검사 (400), 해시는 읽으면서 계산
+    - 같은 내용의 이미지는 한 번만 저장됨
+    참조 수 변경은 호출한 쪽의 트랜잭션에 포함되므로 commit은 호출한 쪽에서 함
+    (새 이미지는 호출한 쪽 트랜잭션이 그 행을 건드리기 전에 참조 0인 행을 따로 커밋해 두므로,
+     호출한 쪽이 롤백해도 파일은 참조 0인 행으로 남아 유예 시간이 지나면 스위퍼가 지움)
+    """
+    tmp_path = os.path.join(UPLOAD_DIR, f".{uuid4().hex}.part")
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    image_type = None
+
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="❌ 파일 크기 제한을 초과했습니다.")
+                if image_type is None:
+                    head += chunk[:_SIGNATURE_BYTES]
+                    if len(head) >= _SIGNATURE_BYTES:
+                        image_type = detect_image_type(head)
+                        if image_type is None:
+                            raise HTTPException(status_code=400, detail="❌ 지원하지 않는 이미지 형식입니다.")
+                hasher.update(chunk)
+                await out.write(chunk)
+
+        if image_type is None:
+            image_type = detect_image_type(head)
+            if image_type is None:
+                raise HTTPException(status_code=400, detail="❌ 지원하지 않는 이미지 형식입니다.")
+
+        ext, content_type = image_type
+        sha256 = hasher.hexdigest()
+        filename = blob_path(sha256, ext)
+        created = False
+        if not await _blob_exists(db, sha256):
+            created = await _reserve_blob(sha256, filename, size, content_type)
+        if not await _acquire_blob(db, sha256):
+            # 확인 직후 스위퍼가 행을 지운 드문 경우: 이제는 같은 트랜잭션 안에서만 만들 수 있음
+            created = await _insert_blob(db, sha256, filename, size, content_type)
+        await anyio.to_thread.run_sync(_place_blob, tmp_path, filename, created)
+    except BaseException:
+        # 취소(CancelledError)된 경우에도 임시 파일이 남지 않도록 바로 삭제
+        _remove_quietly(tmp_path)
+        raise
+
+    # 🖼 썸네일/중간 크기/WebP 변형 생성 (이미 있으면 건너뜀)
+    if has_variants(filename):
+        try:
+            await create_variants(os.path.join(UPLOAD_DIR, filename))
+        except Exception:
+            if created:
+                await anyio.to_thread.run_sync(_remove_blob_files, filename)
+            raise HTTPException(status_code=400, detail="❌ 이미지를 처리할 수 없습니다.")
+
+    inc_metric("upload_bytes_total", size)
+    inc_metric("uploads_total", result="new" if created else "duplicate")
+    return StoredUpload(
+        filename=filename,
+        url=f"/uploads/{filename}",
+        sha256=sha256,
+        size=size,
+        content_type=content_type,
+    )
+
+
+async def _blob_exists(db: AsyncSession, sha256: str) -> bool:
+    # 잠금 없는 조회 (MySQL에서 행이 없을 때 UPDATE가 거는 gap lock을 피하기 위해 먼저 확인)
+    result = await db.execute(select(ImageBlob.sha256).where(ImageBlob.sha256 == sha256))
+    return result.first() is not None
+
+
+async def _acquire_blob(db: AsyncSession, sha256: str) -> bool:
+    """
+    호출한 쪽 트랜잭션에서 참조 수 +1 (행이 없으면 False)
+    커밋/롤백 전까지 행이 잠기므로 스위퍼가 이 이미지를 지우지 못함
+    스위퍼가 같은 행을 정리 중이면 행 잠금 때문에 여기서 기다리게 됨
+    """
+    result = await db.execute(
+        update(ImageBlob)
+        .where(ImageBlob.sha256 == sha256)
+        .values(ref_count=ImageBlob.ref_count + 1, released_at=None)
+    )
+    return bool(result.rowcount)
+
+
+async def _reserve_blob(sha256: str, path: str, size: int, content_type: str) -> bool:
+    """
+    처음 올라온 이미지: 참조 0인 행을 별도 트랜잭션으로 먼저 커밋 (파일보다 행이 먼저 생기도록)
+    호출한 쪽이 롤백하면 이 행은 참조 0으로 남아 스위퍼가 파일과 함께 정리함
+    동시에 같은 이미지를 올린 다른 요청이 먼저 행을 만들었으면 False
+    호출한 쪽 트랜잭션이 이 키를 UPDATE하기 전에 불러야 함 (그 뒤에는 잠금 때문에 기다리거나 실패함)
+    """
+    async with AsyncSessionLocal() as session:
+        session.add(ImageBlob(
+            sha256=sha256, path=path, size=size, content_type=content_type,
+            ref_count=0, released_at=datetime.utcnow(),
+        ))
+        try:
+            await session.commit()
+        except IntegrityError:
+            return False
+    return True
+
+
+async def _insert_blob(db: AsyncSession, sha256: str, path: str, size: int, content_type: str) -> bool:
+    """
+    호출한 쪽 트랜잭션 안에서 참조 1인 행을 만듦. 새로 만들었으면 True
+    """
+    while True:
+        try:
+            async with db.begin_nested():
+                db.add(ImageBlob(sha256=sha256, path=path, size=size, content_type=content_type, ref_count=1))
+            return True
+        except IntegrityError:
+            # 동시에 같은 이미지를 올린 다른 요청이 먼저 행을 만든 경우 → 다시 +1 시도
+            if await _acquire_blob(db, sha256):
+                return False
+
+
+def _place_blob(tmp_path: str, filename: str, created: bool):
+    target = os.path.join(UPLOAD_DIR, filename)
+    if created or not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+    else:
+        _remove_quietly(tmp_path)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_blob_files(path: str):
+    # 원본과 변형 이미지를 모두 삭제
+    _remove_quietly(os.path.join(UPLOAD_DIR, path))
+    if has_variants(path):
+        for name in VARIANTS:
+            _remove_quietly(os.path.join(UPLOAD_DIR, variant_path(path, name)))
+
+
+# 📎 커밋된 뒤에 실행할 파일 작업 (롤백되면 버림)
+_AFTER_COMMIT_KEY = "upload_after_commit"
+
+
+def run_after_commit(db: AsyncSession, func, *args):
+    db.sync_session.info.setdefault(_AFTER_COMMIT_KEY, []).append((func, args))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_pending_file_ops(session):
+    ops = session.info.pop(_AFTER_COMMIT_KEY, [])
+    if not ops:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for func, args in ops:
+        if loop is None:
+            func(*args)
+        else:
+            loop.run_in_executor(None, func, *args)  # 파일 I/O로 이벤트 루프를 막지 않음
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending_file_ops(session, transaction):
+    # 최상위 트랜잭션이 커밋 없이 끝났으면(롤백/close) 예약한 작업을 버림
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
+# 🗑 업로드 참조 해제
+async def release_upload(db: AsyncSession, image_url: Optional[str]):
+    """
+    image_url(/uploads/... 또는 전체 URL)의 참조 수를 1 내림
+    실제 파일은 참조가 0이 되고 유예 시간이 지난 뒤 스위퍼가 지움
+    (내용 주소 방식 이전에 저장된 uuid 파일은 공유되지 않으므로 바로 삭제)
+    """
+    if not image_url:
+        return
+    match = _BLOB_URL_RE.search(image_url)
+    if not match:
+        # 롤백되면 게시글/댓글이 그대로 파일을 가리키므로 커밋된 뒤에만 삭제
+        run_after_commit(db, _remove_quietly, os.path.join(UPLOAD_DIR, os.path.basename(image_url)))
+        return
+    # released_at을 먼저 계산해야 MySQL에서도 감소 전 ref_count 기준으로 판단함
+    await db.execute(
+        update(ImageBlob)
+        .where(ImageBlob.sha256 == match.group(3), ImageBlob.ref_count > 0)
+        .ordered_values(
+            (ImageBlob.released_at, case((ImageBlob.ref_count <= 1, datetime.utcnow()), else_=ImageBlob.released_at)),
+            (ImageBlob.ref_count, ImageBlob.ref_count - 1),
+        )
+    )
+
+
+# 🧹 고아 이미지 정리
+async def sweep_orphan_blobs() -> int:
+    """
+    참조 수가 0이고 유예 시간이 지난 이미지를 삭제하고 삭제한 개수를 반환
+    행을 FOR UPDATE로 잠근 채 파일을 지우므로, 그 사이 같은 이미지를 올리는 요청은
+    잠금이 풀릴 때까지 기다렸다가 새 행을 만들고 파일을 다시 기록함
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=BLOB_SWEEP_GRACE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ImageBlob.sha256)
+            .where(ImageBlob.ref_count <= 0, ImageBlob.released_at < cutoff)
+            .limit(BLOB_SWEEP_BATCH)
+        )
+        candidates = result.scalars().all()
+
+        removed = 0
+        for sha256 in candidates:
+            result = await db.execute(
+                select(ImageBlob)
+                .where(ImageBlob.sha256 == sha256, ImageBlob.ref_count <= 0)
+                .with_for_update()
+            )
+            blob = result.scalars().first()
+            if blob is None:
+                await db.rollback()
+                continue
+            await anyio.to_thread.run_sync(_remove_blob_files, blob.path)
+            await db.execute(delete(ImageBlob).where(ImageBlob.sha256 == sha256))
+            await db.commit()
+            removed += 1
+
+    await anyio.to_thread.run_sync(_sweep_stale_parts)
+    return removed
+
+
+def _sweep_stale_parts():
+    # 업로드/변형 생성 도중 프로세스가 죽어 남은 임시 파일 정리 (변형 .part는 ab/cd/ 하위 폴더에 있음)
+    cutoff = time.time() - BLOB_SWEEP_GRACE_SECONDS
+    for root, _dirs, files in os.walk(UPLOAD_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stale = name.endswith(".part") and os.path.getmtime(path) < cutoff
+            except OSError:
+                continue  # 그 사이 완료되어 이름이 바뀐 파일
+            if stale:
+                _remove_quietly(path)
+
+
+async def blob_sweeper_loop():
+    """
+    BLOB_SWEEP_INTERVAL마다 sweep_orphan_blobs 실행 (앱 시작 시 백그라운드 태스크로 띄움)
+    """
+    while True:
+        await asyncio.sleep(BLOB_SWEEP_INTERVAL)
+        try:
+            removed = await sweep_orphan_blobs()
+            if removed:
+                print(f"🧹 고아 이미지 {removed}개 정리")
+        except Exception as err:
+            print(f"Error: 이미지 정리 실패 ({err})")
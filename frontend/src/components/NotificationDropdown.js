@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useCallback } from 'react';
+import React, { useEffect, useState, useCallback, useRef } from 'react';
 import axios from 'axios';
 import { Dropdown } from 'react-bootstrap';
 import { useAuth } from '../context/AuthContext';
@@ -7,18 +7,21 @@ import { useNavigate } from 'react-router-dom';
 const NotificationDropdown = ({ buttonStyle }) => {
   const { user, token } = useAuth();
   const [notifications, setNotifications] = useState([]);
+  const lastIdRef = useRef(null);
   const navigate = useNavigate();
 
   // 🔄 알림 목록 가져오기 함수
   const fetchNotifications = useCallback(async () => {
     try {
+      // 안 읽은 알림만 조회
       const res = await axios.get('http://localhost:8000/notifications/', {
+        params: { unread_only: true },
         headers: {
           Authorization: `Bearer ${token}`,
         },
       });
-      // 안 읽은 알림만 필터링
-      setNotifications(res.data.filter((n) => !n.is_read));
+      setNotifications(res.data);
+      lastIdRef.current = res.data.reduce((max, n) => Math.max(max, n.id), lastIdRef.current || 0);
     } catch (err) {
       console.error('알림 조회 실패:', err);
     }
@@ -30,6 +33,59 @@ const NotificationDropdown = ({ buttonStyle }) => {
     }
   }, [user, token, fetchNotifications]);
 
+  // 📡 실시간 알림 (WebSocket, 끊기면 마지막 알림 ID부터 다시 이어받음)
+  useEffect(() => {
+    if (!user || !token) return undefined;
+
+    let socket = null;
+    let retryTimer = null;
+    let retryDelay = 1000;
+    let closed = false;
+
+    const connect = () => {
+      const params = new URLSearchParams({ token });
+      if (lastIdRef.current !== null) {
+        params.set('last_id', lastIdRef.current);
+      }
+      socket = new WebSocket(`ws://localhost:8000/notifications/ws?${params}`);
+
+      socket.onopen = () => {
+        retryDelay = 1000;
+      };
+
+      socket.onmessage = (e) => {
+        const msg = JSON.parse(e.data);
+        if (msg.event === 'notification') {
+          const notif = msg.data;
+          lastIdRef.current = Math.max(lastIdRef.current || 0, notif.id);
+          if (!notif.is_read) {
+            setNotifications((prev) =>
+              prev.some((n) => n.id === notif.id) ? prev : [notif, ...prev]
+            );
+          }
+        } else if (msg.event === 'read' || msg.event === 'deleted') {
+          setNotifications((prev) => (msg.id ? prev.filter((n) => n.id !== msg.id) : []));
+        } else if (msg.event === 'resync') {
+          fetchNotifications();
+        }
+      };
+
+      socket.onclose = (e) => {
+        if (closed || e.code === 1008) return; // 1008: 인증 실패
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (socket) socket.close();
+    };
+  }, [user, token, fetchNotifications]);
+
   // ✅ 알림 클릭 시 읽음 처리 후 해당 게시글로 이동
   const handleClick = async (notif) => {
     try {
@@ -10,6 +10,7 @@ const PostDetail = () => {
 
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [nextCommentCursor, setNextCommentCursor] = useState(null);
   const [commentContent, setCommentContent] = useState('');
   const [commentImage, setCommentImage] = useState(null);
   const [editingCommentId, setEditingCommentId] = useState(null);
@@ -27,18 +28,36 @@ const PostDetail = () => {
     fetchComments();
   }, [id]);
 
-  const fetchComments = async () => {
+  // 🔄 댓글 페이지 조회 (cursor가 있으면 다음 페이지를 이어 붙임, 대댓글은 미리보기만)
+  const fetchComments = async (cursor = null) => {
     try {
-      const res = await axios.get(`http://localhost:8000/comments/${id}`, {
+      const res = await axios.get(`http://localhost:8000/comments/${id}/threads`, {
+        params: cursor ? { cursor } : {},
         headers: { Authorization: `Bearer ${token}` },
       });
-      const sorted = res.data.sort((a, b) => new Date(a.created_at) - new Date(b.created_at));
-      setComments(sorted);
+      setComments((prev) => (cursor ? [...prev, ...res.data.comments] : res.data.comments));
+      setNextCommentCursor(res.data.next_cursor);
     } catch (err) {
       console.error('댓글 불러오기 실패:', err);
     }
   };
 
+  // ↪ 대댓글 더 보기
+  const fetchMoreReplies = async (comment) => {
+    try {
+      const res = await axios.get(`http://localhost:8000/comments/replies/${comment.id}`, {
+        params: comment.next_reply_cursor ? { cursor: comment.next_reply_cursor } : {},
+      });
+      setComments((prev) => prev.map((c) => {
+        if (c.id !== comment.id) return c;
+        const replies = comment.next_reply_cursor ? [...c.replies, ...res.data.replies] : res.data.replies;
+        return { ...c, replies, next_reply_cursor: res.data.next_cursor };
+      }));
+    } catch (err) {
+      console.error('대댓글 불러오기 실패:', err);
+    }
+  };
+
   // ✅ 게시글은 KST로 저장되어 있으므로 그대로 출력
   const formatPostDate = (date) => {
     const d = new Date(date);
@@ -222,7 +241,7 @@ const PostDetail = () => {
         {post.nickname} | {formatPostDate(post.created_at)}
         {user && (
           <span className="float-end">
-            {user.user_id === post.user_id && (
+            {user.id === post.owner_id && (
               <>
                 <button className="btn btn-sm btn-outline-primary me-2" onClick={() => navigate(`/edit/${post.id}`)}>✏️ 수정</button>
                 <button className="btn btn-sm btn-outline-danger me-2" onClick={() => handleDelete(post.id)}>🗑 삭제</button>
@@ -237,7 +256,7 @@ const PostDetail = () => {
       <hr />
 
       {post.image_url && (
-        <img src={`http://localhost:8000${post.image_url}`} alt="post" className="mb-3" style={{ width: '100%', maxWidth: '850px' }} />
+        <img src={`http://localhost:8000${post.image_variants?.medium || post.image_url}`} alt="post" className="mb-3" style={{ width: '100%', maxWidth: '850px' }} />
       )}
       <p>{post.content}</p>
       <hr />
@@ -266,7 +285,7 @@ const PostDetail = () => {
             </div>
 
             {comment.image_url && (
-              <img src={`http://localhost:8000${comment.image_url}`} style={{ maxWidth: '150px', maxHeight: '150px' }} alt="comment" className="mb-2" />
+              <img src={`http://localhost:8000${comment.image_variants?.thumb || comment.image_url}`} style={{ maxWidth: '150px', maxHeight: '150px' }} alt="comment" className="mb-2" />
             )}
 
             {editingCommentId === comment.id ? (
@@ -318,7 +337,7 @@ const PostDetail = () => {
                       </div>
                       {reply.image_url && (
                         <div>
-                          <img src={`http://localhost:8000${reply.image_url}`} style={{ maxWidth: '150px', maxHeight: '150px' }} alt="reply" className="mb-1" />
+                          <img src={`http://localhost:8000${reply.image_variants?.thumb || reply.image_url}`} style={{ maxWidth: '150px', maxHeight: '150px' }} alt="reply" className="mb-1" />
                         </div>
                       )}
                       {editingReplyId === reply.id ? (
@@ -336,10 +355,24 @@ const PostDetail = () => {
                 ))}
               </ul>
             )}
+
+            {comment.reply_count > (comment.replies?.length || 0) && (
+              <button className="btn btn-sm btn-link ps-3" onClick={() => fetchMoreReplies(comment)}>
+                대댓글 더 보기 ({comment.reply_count - comment.replies.length})
+              </button>
+            )}
           </li>
         ))}
       </ul>
 
+      {nextCommentCursor && (
+        <div className="text-center mt-2">
+          <button className="btn btn-sm btn-outline-secondary" onClick={() => fetchComments(nextCommentCursor)}>
+            댓글 더 보기
+          </button>
+        </div>
+      )}
+
       {/* 댓글 작성 폼 */}
       <form onSubmit={handleCommentSubmit} className="mt-4 mb-5">
         <textarea className="form-control mb-2" placeholder="댓글을 입력하세요" value={commentContent} onChange={(e) => setCommentContent(e.target.value)} required />
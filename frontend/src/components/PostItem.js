@@ -7,7 +7,7 @@ const PostItem = ({ post }) => {
       <p>{post.content}</p>
       {post.image_url && (
         <img
-          src={`http://localhost:8000${post.image_url}`}
+          src={`http://localhost:8000${post.image_variants?.medium || post.image_url}`}
           alt={post.title}
           style={{ maxWidth: '100%', height: 'auto' }}
         />
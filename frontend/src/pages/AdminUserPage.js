@@ -8,14 +8,17 @@ const AdminUserPage = () => {
   const { user, token } = useAuth();
   const navigate = useNavigate();
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
-  // ✅ 유저 목록 불러오기
-  const fetchUsers = async () => {
+  // ✅ 유저 목록 불러오기 (cursor가 있으면 다음 페이지를 이어 붙임)
+  const fetchUsers = async (cursor = null) => {
     try {
       const res = await axios.get('http://localhost:8000/admin/users', {
+        params: cursor ? { cursor } : {},
         headers: { Authorization: `Bearer ${token}` }
       });
-      setUsers(res.data);
+      setUsers((prev) => (cursor ? [...prev, ...res.data] : res.data));
+      setNextCursor(res.headers['x-next-cursor'] || null);
     } catch (err) {
       console.error('유저 불러오기 실패:', err);
     }
@@ -111,6 +114,13 @@ const AdminUserPage = () => {
           ))}
         </tbody>
       </table>
+      {nextCursor && (
+        <div className="text-center mb-4">
+          <button className="btn btn-outline-secondary btn-sm" onClick={() => fetchUsers(nextCursor)}>
+            더 보기
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useState, useCallback } from 'react';
 import axios from 'axios';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
@@ -6,24 +6,28 @@ import { useNavigate } from 'react-router-dom';
 const Notifications = () => {
   const { user, token } = useAuth();
   const [notifications, setNotifications] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const navigate = useNavigate();
 
-  useEffect(() => {
-    const fetchNotifications = async () => {
-      try {
-        const res = await axios.get('http://localhost:8000/notifications/', {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        setNotifications(res.data);
-      } catch (err) {
-        console.error('알림 전체 조회 실패:', err);
-      }
-    };
+  // 🔄 알림 목록 가져오기 (cursor가 있으면 다음 페이지를 이어 붙임)
+  const fetchNotifications = useCallback(async (cursor = null) => {
+    try {
+      const res = await axios.get('http://localhost:8000/notifications/', {
+        params: cursor ? { cursor } : {},
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      setNotifications((prev) => (cursor ? [...prev, ...res.data] : res.data));
+      setNextCursor(res.headers['x-next-cursor'] || null);
+    } catch (err) {
+      console.error('알림 전체 조회 실패:', err);
+    }
+  }, [token]);
 
+  useEffect(() => {
     if (user && token) {
       fetchNotifications();
     }
-  }, [user, token]);
+  }, [user, token, fetchNotifications]);
 
   const handleClick = async (notif) => {
     try {
@@ -56,6 +60,13 @@ const Notifications = () => {
           ))
         )}
       </ul>
+      {nextCursor && (
+        <div className="text-center mt-3">
+          <button className="btn btn-outline-secondary btn-sm" onClick={() => fetchNotifications(nextCursor)}>
+            더 보기
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -174,6 +174,7 @@ const PostList = () => {
             <option value="newest">📅 최신순</option>
             <option value="oldest">📜 오래된순</option>
             <option value="title">🔤 제목순</option>
+            <option value="active">💬 최근 활동순</option>
           </select>
           <Link
             to="/create"
@@ -193,7 +194,10 @@ const PostList = () => {
             key={post.id}
             className="list-group-item list-group-item-action"
           >
-            <h5 className="mb-1">{post.title}</h5>
+            <h5 className="mb-1">
+              {post.title}
+              {post.comment_count > 0 && <span className="text-primary ms-2 small">[{post.comment_count}]</span>}
+            </h5>
             <small className="text-muted">
               {post.nickname} | 작성일: {new Date(post.created_at).toLocaleString('ko-KR', {
                 year: 'numeric',